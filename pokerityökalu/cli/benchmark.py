@@ -0,0 +1,291 @@
+﻿# -*- coding: utf-8 -*-
+
+"""
+Mikrobenchmarkit moottorin kuumille poluille.
+
+Jokainen benchmark ajetaan useaan kertaan, ja paras ops/s verrataan
+tallennettuun baselineen. Jos jokin hidastuu yli kynnyksen, skripti
+palauttaa exit-koodin 1. Jos baselinea ei ole (oletuspolku on
+gitignoroidussa DATA_DIR:ssä, joten tuoreessa checkoutissa sitä ei ole),
+tai siitä puuttuu ajettu benchmark, vertailua ei tehdä ja exit-koodi on 2.
+
+Käyttö:
+    python cli/benchmark.py --save               # tallenna baseline
+    python cli/benchmark.py                      # vertaa baselineen
+    python cli/benchmark.py --threshold 10 --only simulate
+"""
+
+import argparse
+import json
+import random
+import sys
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+
+
+from engine.betting_model import opponent_call_decision
+from engine.cards import Deck
+from engine.config import DATA_DIR
+from engine.evaluator import get_evaluator
+from engine.hero_strategy import HeroStrategyProfile
+from engine.player_profile import PlayerProfile
+from engine.positional_player import PositionalPlayer
+from engine.range_generator import RangeCache, compile_opponents, generate_profile_range
+from engine.ranges import generate_combos
+from engine.simulator import board_texture, detect_draws, hand_strength_bucket, simulate_postflop_once
+from engine.utils import weighted_choice
+
+
+BASELINE_PATH = DATA_DIR / "benchmark_baseline.json"
+
+EXIT_REGRESSION = 1
+EXIT_NO_BASELINE = 2
+
+# Syötteitä kierrätetään, jotta yksi vakiosyöte ei vääristä tulosta
+N_INPUTS = 256
+
+
+def _random_spots(rng, board_size):
+    spots = []
+    for _ in range(N_INPUTS):
+        cards = rng.sample(range(52), 2 + board_size)
+        spots.append((cards[:2], cards[2:]))
+    return spots
+
+
+def _cycle(items):
+    n = len(items)
+    state = {"i": 0}
+
+    def next_item():
+        i = state["i"]
+        state["i"] = (i + 1) % n
+        return items[i]
+
+    return next_item
+
+
+# =====================================================
+# BENCHMARKIT: nimi → tehdas, joka palauttaa yhden operaation
+# =====================================================
+
+def bench_hand_strength_bucket(evaluator):
+    next_spot = _cycle(_random_spots(random.Random(1), 5))
+
+    def op():
+        hand, board = next_spot()
+        hand_strength_bucket(hand, board, evaluator)
+    return op
+
+
+def bench_board_texture(evaluator):
+    next_spot = _cycle(_random_spots(random.Random(2), 4))
+
+    def op():
+        board_texture(next_spot()[1])
+    return op
+
+
+def bench_detect_draws(evaluator):
+    next_spot = _cycle(_random_spots(random.Random(3), 4))
+
+    def op():
+        detect_draws(next_spot()[1])
+    return op
+
+
+def bench_generate_combos(evaluator):
+    next_code = _cycle(["AA", "AKs", "AKo", "T9s", "72o", "55"])
+
+    def op():
+        generate_combos(next_code())
+    return op
+
+
+def bench_generate_profile_range(evaluator):
+    rng = random.Random(4)
+    profile = PlayerProfile(vpip=35)
+
+    def op():
+        generate_profile_range(profile, "BTN", rng)
+    return op
+
+
+def bench_weighted_choice(evaluator):
+    rng = random.Random(5)
+    items = list(range(200))
+    weights = [rng.uniform(0.5, 1.5) for _ in items]
+
+    def op():
+        weighted_choice(items, weights, rng)
+    return op
+
+
+def bench_deck_deal(evaluator):
+    # heron kortit, flop ja kaksi vastustajaa pois, turn + river arvotaan
+    rng = random.Random(8)
+    deck = Deck()
+    dead = (48, 49, 40, 25, 2, 44, 45, 36, 32)
+
+    def op():
+        deck.reset(dead)
+        deck.draw(2, rng)
+    return op
+
+
+def bench_opponent_call_decision(evaluator):
+    next_spot = _cycle(_random_spots(random.Random(6), 3))
+
+    def op():
+        hand, board = next_spot()
+        opponent_call_decision(hand, board, "flop", 10.0, 5.0, "semi", 1, evaluator=evaluator)
+    return op
+
+
+def _bench_simulate(opp_count):
+    def factory(evaluator):
+        profile = PlayerProfile(vpip=45, fold_flop=35, fold_turn=45, fold_river=50)
+        player = PositionalPlayer("Bench", {"BTN": profile})
+        opponents = compile_opponents([(player, "BTN")] * opp_count, RangeCache(7))
+
+        hero_hand = [48, 49]        # AsAh
+        board = [40, 25, 2]         # Qs 8h 2d
+        strategy = HeroStrategyProfile()
+        deck = Deck()
+        random.seed(7)
+
+        def op():
+            simulate_postflop_once(
+                hero_hand, board, opponents, evaluator,
+                hero_strategy=strategy, deck=deck,
+            )
+        return op
+    return factory
+
+
+BENCHMARKS = {
+    "hand_strength_bucket": bench_hand_strength_bucket,
+    "board_texture": bench_board_texture,
+    "detect_draws": bench_detect_draws,
+    "generate_combos": bench_generate_combos,
+    "generate_profile_range": bench_generate_profile_range,
+    "weighted_choice": bench_weighted_choice,
+    "deck_deal": bench_deck_deal,
+    "opponent_call_decision": bench_opponent_call_decision,
+    "simulate_postflop_once_hu": _bench_simulate(1),
+    "simulate_postflop_once_6max": _bench_simulate(5),
+}
+
+
+# =====================================================
+# AJO
+# =====================================================
+
+def measure(op, min_time: float, repeats: int) -> float:
+    """Paras ops/s repeats-kierroksesta, kukin vähintään min_time sekuntia."""
+    # kalibrointi: kierroksen koko niin, että yksi kierros kestää ~min_time
+    n = 1
+    while True:
+        start = time.perf_counter()
+        for _ in range(n):
+            op()
+        elapsed = time.perf_counter() - start
+        if elapsed >= min_time / 4:
+            break
+        n *= 4
+    loops = max(1, int(n * min_time / max(elapsed, 1e-9)))
+
+    best = 0.0
+    for _ in range(repeats):
+        start = time.perf_counter()
+        for _ in range(loops):
+            op()
+        elapsed = time.perf_counter() - start
+        best = max(best, loops / elapsed)
+    return best
+
+
+def run_benchmarks(names, backend: str, min_time: float, repeats: int) -> dict:
+    evaluator = get_evaluator(backend)
+    results = {}
+    for name in names:
+        results[name] = measure(BENCHMARKS[name](evaluator), min_time, repeats)
+    return results
+
+
+def compare(results: dict, baseline: dict, threshold: float) -> list:
+    """Palauttaa hidastuneet benchmarkit [(nimi, muutos %)]."""
+    regressions = []
+    for name, ops in results.items():
+        base = baseline.get(name)
+        change = (ops / base - 1) * 100 if base else None
+
+        status = ""
+        if change is not None and change < -threshold:
+            status = "  ⚠️ REGRESSIO"
+            regressions.append((name, change))
+
+        change_str = f"{change:+6.1f}%" if change is not None else "     -"
+        base_str = f"{base:12,.0f}" if base else " " * 12
+        print(f"  {name:<30} {ops:12,.0f} ops/s | baseline {base_str} | {change_str}{status}")
+
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Moottorin mikrobenchmarkit")
+    parser.add_argument("--baseline", type=Path, default=BASELINE_PATH)
+    parser.add_argument("--save", action="store_true", help="tallenna tulokset baselineksi")
+    parser.add_argument("--threshold", type=float, default=15.0, help="sallittu hidastuma (%%)")
+    parser.add_argument("--backend", default="treys")
+    parser.add_argument("--min-time", type=float, default=0.3)
+    parser.add_argument("--repeats", type=int, default=3)
+    parser.add_argument("--only", default=None, help="aja vain benchmarkit, joiden nimessä on tämä")
+    args = parser.parse_args()
+
+    names = [n for n in BENCHMARKS if args.only is None or args.only in n]
+
+    baseline = {}
+    baseline_note = f"baselinea ei löydy: {args.baseline}"
+    if args.baseline.exists():
+        stored = json.loads(args.baseline.read_text(encoding="utf-8"))
+        if stored.get("backend") == args.backend:
+            baseline = stored["ops_per_sec"]
+        else:
+            baseline_note = (
+                f"baseline {args.baseline} on backendille {stored.get('backend')}, "
+                f"ei {args.backend}"
+            )
+
+    print(f"Benchmarkit (backend={args.backend}, kynnys {args.threshold:.0f} %)")
+    results = run_benchmarks(names, args.backend, args.min_time, args.repeats)
+    regressions = compare(results, baseline, args.threshold)
+
+    if args.save:
+        merged = dict(baseline)
+        merged.update(results)
+        args.baseline.parent.mkdir(parents=True, exist_ok=True)
+        args.baseline.write_text(
+            json.dumps({"backend": args.backend, "ops_per_sec": merged}, indent=2),
+            encoding="utf-8",
+        )
+        print(f"Baseline tallennettu → {args.baseline}")
+        return
+
+    if regressions:
+        print(f"{len(regressions)} benchmarkia hidastui yli {args.threshold:.0f} %")
+        sys.exit(EXIT_REGRESSION)
+
+    missing = [name for name in results if not baseline.get(name)]
+    if missing:
+        if baseline:
+            baseline_note = f"baselinesta puuttuu: {', '.join(missing)}"
+        print(f"EI VERTAILUA – {baseline_note}. Tallenna baseline ajamalla --save.")
+        sys.exit(EXIT_NO_BASELINE)
+
+
+if __name__ == "__main__":
+    main()
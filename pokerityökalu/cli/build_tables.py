@@ -0,0 +1,55 @@
+﻿# -*- coding: utf-8 -*-
+
+"""
+Rakentaa valmiiksi lasketut taulut DATA_DIR:iin (ajetaan kerran).
+
+Käyttö:
+    python cli/build_tables.py
+    python cli/build_tables.py --preflop --workers 8
+    python cli/build_tables.py --preflop --boards 2000   # nopea otosversio
+
+Preflop-taulu on pitkä ajo (tarkka laskenta: C(48, 5) boardia per
+variantti). Se checkpointtaa jokaisen luokkaparin, joten keskeytetty ajo
+jatkuu samalla komennolla.
+"""
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+
+
+from engine.board_index import build_board_index
+from engine.config import DATA_DIR
+from engine.preflop_equity import TABLE_PATH, build_preflop_table
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Rakentaa valmiit taulut")
+    parser.add_argument("--preflop", action="store_true", help="rakenna myös 169x169 preflop-equitytaulu")
+    parser.add_argument("--workers", type=int, default=1)
+    parser.add_argument("--boards", type=int, default=None, help="boardeja per matchup (oletus: tarkka)")
+    args = parser.parse_args()
+
+    start = time.time()
+    print(f"Board-indeksi → {DATA_DIR}")
+    build_board_index()
+    print(f"  valmis ({time.time() - start:.1f} s)")
+
+    if args.preflop:
+        start = time.time()
+        print(f"Preflop-equity → {TABLE_PATH}")
+
+        def progress(done, total):
+            if done % 100 == 0 or done == total:
+                print(f"  {done}/{total} luokkaparia ({time.time() - start:.0f} s)", flush=True)
+
+        build_preflop_table(workers=args.workers, boards_per_matchup=args.boards, progress=progress)
+        print(f"  valmis ({time.time() - start:.1f} s)")
+
+
+if __name__ == "__main__":
+    main()
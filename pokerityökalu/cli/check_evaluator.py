@@ -0,0 +1,60 @@
+﻿# -*- coding: utf-8 -*-
+
+"""
+Vertaa evaluator-backendia treysiin satunnaisilla 5/6/7-kortin käsillä.
+
+Käyttö:
+    python cli/check_evaluator.py [backend] [käsiä] [seed]
+
+Kiinteän seedin versio ajetaan testeissä (tests/test_evaluator.py).
+"""
+
+import random
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+
+
+from treys import Evaluator
+
+from engine.cards import TREYS_CARDS, cards_str
+from engine.evaluator import get_evaluator
+
+
+def check_backend(backend: str, hands: int = 20000, seed: int = 1) -> int:
+    rng = random.Random(seed)
+    reference = Evaluator()
+    candidate = get_evaluator(backend)
+
+    mismatches = 0
+    for i in range(hands):
+        size = 5 + i % 3
+        cards = rng.sample(range(52), size)
+        hand = [TREYS_CARDS[c] for c in cards[:2]]
+        board = [TREYS_CARDS[c] for c in cards[2:]]
+
+        expected = reference.evaluate(board, hand)
+        got = candidate.evaluate(board, hand)
+
+        if got != expected:
+            mismatches += 1
+            if mismatches <= 10:
+                print(f"  ERO {cards_str(cards)}: treys={expected} {backend}={got}")
+
+    print(f"{backend}: {hands} kättä, {mismatches} eroa")
+    return mismatches
+
+
+def main():
+    backend = sys.argv[1] if len(sys.argv) > 1 else "lookup"
+    hands = int(sys.argv[2]) if len(sys.argv) > 2 else 20000
+    seed = int(sys.argv[3]) if len(sys.argv) > 3 else 1
+
+    if check_backend(backend, hands, seed):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,87 @@
+﻿# -*- coding: utf-8 -*-
+
+"""
+Preflop-sweep: 13x13 bb/100-ruudukko per positio (engine.preflop_sweep).
+
+Käyttö:
+    python cli/preflop_sweep.py --opponents tight loose --iterations 2000 --workers 8
+    python cli/preflop_sweep.py --positions BTN BB --opps 1 -o sweep.json
+    python cli/preflop_sweep.py --all-combos --target-ci 5
+
+Vastustajat ovat profiilinimiä (cli/run_batch.py:n PROFILE_PRESETS tai
+--profiles-tiedosto).
+"""
+
+import argparse
+import json
+import sys
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+
+
+from cli.run_batch import _json_safe, build_opponent, load_profiles
+from engine.config import SimulationConfig
+from engine.preflop_sweep import SWEEP_POSITIONS, format_grid, run_preflop_sweep
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Kaikkien 169 käsiluokan preflop-sweep")
+    parser.add_argument("--opponents", nargs="+", default=["default"], help="profiilien nimet")
+    parser.add_argument("--profiles", default=None, help="JSON: {nimi: PlayerProfile-kentät}")
+    parser.add_argument("--positions", nargs="+", default=list(SWEEP_POSITIONS))
+    parser.add_argument("--opps", type=int, nargs="+", default=None, help="vastustajamäärät (oletus: kaikki)")
+    parser.add_argument("--iterations", type=int, default=2000, help="kättä per solu")
+    parser.add_argument("--target-ci", type=float, default=None, help="bb/100 95 %% CI -leveys per solu")
+    parser.add_argument("--all-combos", action="store_true", help="kaikki combot edustajan sijaan")
+    parser.add_argument("--engine", default="python", choices=["python", "numpy"])
+    parser.add_argument("--backend", default="treys")
+    parser.add_argument("--workers", type=int, default=1)
+    parser.add_argument("--seed", type=int, default=None)
+    parser.add_argument("-o", "--output", default=None, help="tulokset JSON-tiedostoon")
+    args = parser.parse_args()
+
+    profiles = load_profiles(args.profiles)
+
+    config = SimulationConfig(
+        hero_hand=[],
+        position=None,
+        board=[],
+        mode="PLAY",
+        iterations=args.iterations,
+        random_seed=args.seed,
+        opponent_profiles=[
+            build_opponent(name, profiles, i) for i, name in enumerate(args.opponents)
+        ],
+        evaluator_backend=args.backend,
+        engine=args.engine,
+        workers=args.workers,
+        target_ci_width=args.target_ci,
+        verbose=False,
+    )
+
+    start = time.time()
+
+    def progress(done, total):
+        if done % 169 == 0 or done == total:
+            print(f"  {done}/{total} solua ({time.time() - start:.0f} s)", file=sys.stderr, flush=True)
+
+    sweep = run_preflop_sweep(
+        config, positions=args.positions, opp_counts=args.opps,
+        all_combos=args.all_combos, progress=progress,
+    )
+
+    for position, opp_count in sweep.results:
+        print(format_grid(sweep, position, opp_count))
+        print()
+
+    print(f"seed={sweep.base_seed} | {time.time() - start:.1f} s", file=sys.stderr)
+
+    if args.output:
+        Path(args.output).write_text(json.dumps(_json_safe(sweep.to_dict())), encoding="utf-8")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,229 @@
+﻿# -*- coding: utf-8 -*-
+
+"""
+Eräajo: skenaariot JSONL-tiedostosta, tulokset JSONL-tiedostoon.
+
+Jokainen syöterivi on yksi skenaario:
+
+    {"id": "AKs-flop-1", "hero_hand": ["Ah", "Kh"], "position": "BTN",
+     "board": ["Qh", "7d", "2h"], "opponents": ["tight", "loose"],
+     "iterations": 5000, "seed": 1}
+
+opponents: profiilinimiä (PROFILE_PRESETS tai --profiles-tiedosto) tai
+PlayerProfile-kenttiä suoraan ({"vpip": 30, "fold_flop": 45}).
+Muut SimulationConfig-kentät (mode, engine, evaluator_backend,
+eval_cache_size, use_board_index, target_ci_width, ...) voi antaa
+sellaisenaan.
+
+mode="EXACT": tulosrivien EV-kentät (ev_per_hand, bb_per_100, ...) ovat
+null, koska panostusta ei mallinneta; hands on läpikäytyjen (matchup,
+runout) -showdownien määrä.
+
+Skenaariot ajetaan process poolissa. Ajossa on korkeintaan 2 * workers
+skenaariota kerrallaan, joten muistinkäyttö ei riipu tiedoston koosta, ja
+tulosrivi kirjoitetaan heti kun skenaario valmistuu (valmistumisjärjestys;
+"line" kertoo syöterivin). Workerit elävät koko ajon, joten evaluaattorit
+ja välimuistit lämpenevät vain kerran per prosessi.
+
+Käyttö:
+    python cli/run_batch.py scenarios.jsonl -o results.jsonl --workers 8
+    python cli/run_batch.py - --profiles profiles.json < scenarios.jsonl
+"""
+
+import argparse
+import json
+import math
+import sys
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from dataclasses import asdict, fields
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+
+
+from engine.config import SimulationConfig
+from engine.player_profile import PlayerProfile
+from engine.positional_player import PositionalPlayer
+from engine.simulator import run_simulation
+
+
+# Samat profiilit kuin cli/run_test.py:ssä
+PROFILE_PRESETS = {
+    "default": {},
+    "tight": {
+        "vpip": 18, "fold_flop": 55, "fold_turn": 65, "fold_river": 70,
+        "aggression": 2.0, "barrel_turn_pct": 30, "barrel_river_pct": 20,
+    },
+    "loose": {
+        "vpip": 35, "fold_flop": 30, "fold_turn": 40, "fold_river": 45,
+        "aggression": 3.5, "barrel_turn_pct": 55, "barrel_river_pct": 40,
+    },
+}
+
+CONFIG_FIELDS = {f.name for f in fields(SimulationConfig)}
+
+# Skenaarion avaimet, jotka eivät ole SimulationConfig-kenttiä sellaisenaan
+SCENARIO_KEYS = {"id", "opponents", "seed"}
+
+
+# =====================================================
+# SKENAARIO → CONFIG
+# =====================================================
+
+def build_opponent(ref, profiles: dict, index: int) -> PositionalPlayer:
+    if isinstance(ref, str):
+        if ref not in profiles:
+            raise ValueError(f"Tuntematon profiili: {ref}")
+        name, values = ref, profiles[ref]
+    elif isinstance(ref, dict):
+        name, values = f"Villain-{index + 1}", ref
+    else:
+        raise TypeError("Vastustaja on profiilin nimi tai kenttäsanakirja")
+
+    # sama profiili kaikissa positioissa
+    return PositionalPlayer(name, {}, default_profile=PlayerProfile(**values))
+
+
+def build_config(scenario: dict, profiles: dict) -> SimulationConfig:
+    unknown = set(scenario) - CONFIG_FIELDS - SCENARIO_KEYS
+    if unknown:
+        raise ValueError(f"Tuntemattomat kentät: {', '.join(sorted(unknown))}")
+
+    kwargs = {k: v for k, v in scenario.items() if k in CONFIG_FIELDS}
+    kwargs.setdefault("mode", "PLAY")
+    kwargs.setdefault("position", "BTN")
+    kwargs.setdefault("board", [])
+
+    if "seed" in scenario:
+        kwargs["random_seed"] = scenario["seed"]
+
+    kwargs["opponent_profiles"] = [
+        build_opponent(ref, profiles, i)
+        for i, ref in enumerate(scenario.get("opponents", ["default"]))
+    ]
+
+    # rinnakkaisuus on skenaarioiden välillä; kirjastokäyttö ilman tulosteita
+    kwargs["workers"] = 1
+    kwargs["verbose"] = False
+    return SimulationConfig(**kwargs)
+
+
+def _json_safe(value):
+    if isinstance(value, float) and not math.isfinite(value):
+        return None
+    if isinstance(value, dict):
+        return {k: _json_safe(v) for k, v in value.items()}
+    if isinstance(value, list):
+        return [_json_safe(v) for v in value]
+    return value
+
+
+def run_scenario(line_no: int, scenario: dict, profiles: dict) -> dict:
+    """Ajetaan workerissa; virheet palautetaan tulosrivinä."""
+    start = time.time()
+    out = {"line": line_no, "id": scenario.get("id")}
+
+    try:
+        results = run_simulation(build_config(scenario, profiles))
+        out["results"] = [_json_safe(asdict(r)) for r in results]
+    except Exception as e:
+        out["error"] = f"{type(e).__name__}: {e}"
+
+    out["elapsed"] = round(time.time() - start, 3)
+    return out
+
+
+# =====================================================
+# STRIIMAUS
+# =====================================================
+
+def read_scenarios(stream):
+    """(rivinumero, skenaario) yksi kerrallaan; rikkinäinen rivi → virhe-dict."""
+    for line_no, line in enumerate(stream, start=1):
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            yield line_no, json.loads(line)
+        except ValueError as e:
+            yield line_no, e
+
+
+def run_batch(scenarios, out, profiles: dict, workers: int) -> dict:
+    """
+    Ajaa skenaariot poolissa ja kirjoittaa tulosrivit outiin heti.
+    Palauttaa {"done", "errors"}.
+    """
+    stats = {"done": 0, "errors": 0}
+
+    def emit(row):
+        out.write(json.dumps(row, ensure_ascii=False) + "\n")
+        out.flush()
+        stats["done"] += 1
+        if "error" in row:
+            stats["errors"] += 1
+
+    max_pending = 2 * max(1, workers)
+    pending = set()
+
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        for line_no, scenario in scenarios:
+            if isinstance(scenario, Exception):
+                emit({"line": line_no, "id": None, "error": f"JSON: {scenario}"})
+                continue
+
+            pending.add(executor.submit(run_scenario, line_no, scenario, profiles))
+
+            if len(pending) >= max_pending:
+                finished, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for future in finished:
+                    emit(future.result())
+
+        for future in wait(pending).done:
+            emit(future.result())
+
+    return stats
+
+
+def load_profiles(path) -> dict:
+    profiles = {name: dict(values) for name, values in PROFILE_PRESETS.items()}
+    if path is not None:
+        profiles.update(json.loads(Path(path).read_text(encoding="utf-8")))
+    return profiles
+
+
+def main():
+    parser = argparse.ArgumentParser(description="JSONL-eräajo process poolissa")
+    parser.add_argument("input", help="skenaariot (JSONL), '-' = stdin")
+    parser.add_argument("-o", "--output", default="-", help="tulokset (JSONL), '-' = stdout")
+    parser.add_argument("--workers", type=int, default=1)
+    parser.add_argument("--profiles", default=None, help="JSON: {nimi: PlayerProfile-kentät}")
+    args = parser.parse_args()
+
+    profiles = load_profiles(args.profiles)
+
+    src = sys.stdin if args.input == "-" else open(args.input, "r", encoding="utf-8")
+    dst = sys.stdout if args.output == "-" else open(args.output, "w", encoding="utf-8")
+
+    start = time.time()
+    try:
+        stats = run_batch(read_scenarios(src), dst, profiles, args.workers)
+    finally:
+        if src is not sys.stdin:
+            src.close()
+        if dst is not sys.stdout:
+            dst.close()
+
+    print(
+        f"{stats['done']} skenaariota, {stats['errors']} virhettä "
+        f"({time.time() - start:.1f} s)",
+        file=sys.stderr,
+    )
+    if stats["errors"]:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -86,6 +86,7 @@ def main():
         iterations=1000,
         random_seed=42,
         opponent_profiles=opponents,
+        verbose=True,
     )
 
     # ================================
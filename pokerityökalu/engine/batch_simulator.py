@@ -0,0 +1,566 @@
+﻿# -*- coding: utf-8 -*-
+
+"""
+NumPy-batch-moottori (SimulationConfig.engine = "numpy").
+
+Jakaa, bucketoi ja ratkaisee tuhansia käsiä kerralla taulukko-operaatioilla.
+Päätössäännöt ovat samat kuin simulate_postflop_oncessa (opponent call
+-rajat, HU/MW river-profiilit, D1-showdown), mutta satunnaisluvut
+arvotaan eri järjestyksessä, joten tulokset ovat tilastollisesti eivätkä
+bitti bitiltä samat kuin Python-moottorilla.
+"""
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover - numpy on valinnainen
+    np = None
+
+from engine.config import SimulationConfig
+from engine.evaluator import get_evaluator
+from engine.hero_strategy import HeroStrategyProfile
+from engine.lookup_evaluator import PRIMES
+from engine.models import (
+    EXIT_INDEX,
+    EXIT_STREETS,
+    LOSS,
+    LOSS_NOSHOWDOWN,
+    OUTCOMES,
+    TIE,
+    WIN,
+    WIN_NOSHOWDOWN,
+    ResultAccumulator,
+)
+from engine.range_generator import RangeCache
+from engine.simulator import HU_RIVER_PROFILE, MW_RIVER_PROFILE
+
+
+# Tuloskoodit (WIN..LOSS_NOSHOWDOWN) ja exit-streetit tulevat models-moduulista
+
+# Tekstuurikoodit
+DRY, SEMI, WET = range(3)
+
+SB = 0.5
+BB = 1.0
+STACK = 100.0
+
+
+def _require_numpy():
+    if np is None:
+        raise ImportError("engine='numpy' vaatii numpy-paketin (pip install numpy)")
+
+
+class BatchEvaluator:
+    """
+    LookupEvaluatorin taulut numpy-muodossa: evaluoi (n, k) korttimatriisin.
+    """
+
+    def __init__(self):
+        _require_numpy()
+        lookup = get_evaluator("lookup")
+
+        primes = np.array(PRIMES, dtype=np.int64)
+        self.card_primes = primes[np.arange(52) >> 2]
+        self.card_rankbits = (1 << (np.arange(52) >> 2)).astype(np.int64)
+
+        keys = np.fromiter(lookup.rank_lookup.keys(), dtype=np.int64)
+        values = np.fromiter(lookup.rank_lookup.values(), dtype=np.int64)
+        order = np.argsort(keys)
+        self.keys = keys[order]
+        self.values = values[order]
+        self.flush = np.array(lookup.flush_lookup, dtype=np.int64)
+
+    def evaluate(self, cards):
+        """
+        cards: (n, k) korttilukuja, k = 5..7. Palauttaa treys-rankit (n,).
+        """
+        prime = self.card_primes[cards].prod(axis=1)
+        value = self.values[np.searchsorted(self.keys, prime)]
+
+        suits = cards & 3
+        rankbits = self.card_rankbits[cards]
+        for s in range(4):
+            mask = np.where(suits == s, rankbits, 0).sum(axis=1)
+            flush_value = self.flush[mask]
+            better = (flush_value > 0) & (flush_value < value)
+            value = np.where(better, flush_value, value)
+
+        return value
+
+
+# ======================================================
+# VEKTOROIDUT APURIT
+# ======================================================
+
+def strength_bucket(values):
+    """simulator.hand_strength_bucket -rajat"""
+    return np.select([values <= 1600, values <= 3000, values <= 4500], [3, 2, 1], 0)
+
+
+def call_strength_bucket(values):
+    """board_logic.hand_strength_bucket -rajat (betting model)"""
+    return np.select([values <= 300, values <= 1200, values <= 3000], [3, 2, 1], 0)
+
+
+def board_texture(board):
+    ranks = board >> 2
+    suits = board & 3
+
+    max_suit = np.max([(suits == s).sum(axis=1) for s in range(4)], axis=0)
+    gaps = ranks.max(axis=1) - ranks.min(axis=1)
+
+    return np.select(
+        [(max_suit >= 3) | (gaps <= 4), (max_suit == 2) | (gaps <= 6)],
+        [WET, SEMI],
+        DRY,
+    )
+
+
+def street_bet_size(street, pot_size, texture, aggression):
+    base = {"flop": 0.33, "turn": 0.50}.get(street, 0.66)
+    base = base + np.select([texture == WET, texture == DRY], [0.10, -0.05], 0.0)
+    base = base * (0.8 + aggression * 0.4)
+    base = np.clip(base, 0.2, 0.9)
+    return pot_size * base
+
+
+def hero_should_continue(street, pressure, opp_fold, texture):
+    """HeroDecisionModel.should_continue vektorina"""
+    base_threshold = {"flop": 0.25, "turn": 0.35}.get(street, 0.50)
+    texture_penalty = np.select([texture == WET, texture == SEMI], [0.15, 0.07], 0.0)
+    return opp_fold >= base_threshold + pressure * 0.10 + texture_penalty
+
+
+def opponent_calls(strength, street, pot_size, bet_amount, texture, pressure,
+                   aggression, rng):
+    """betting_model.opponent_call_decision vektorina"""
+    pot_odds = bet_amount / np.maximum(1e-6, pot_size + bet_amount)
+
+    win_prob = np.select([strength >= 3, strength == 2, strength == 1],
+                         [0.85, 0.55, 0.32], 0.08)
+    win_prob = win_prob + aggression * 0.12 - pressure * 0.06
+    win_prob = win_prob + np.select([texture == WET, texture == DRY], [0.06, -0.03], 0.0)
+
+    if street == "flop":
+        win_prob = win_prob + 0.05
+    elif street == "river":
+        win_prob = win_prob - 0.08
+
+    win_prob = np.clip(win_prob, 0.02, 0.95)
+    calls = win_prob >= pot_odds
+
+    if street == "flop":
+        floats = (strength == 0) & (rng.random(len(strength)) < 0.10)
+        calls = calls | floats
+
+    return calls
+
+
+# ======================================================
+# JAKO
+# ======================================================
+
+def _range_arrays(compiled, dead_mask):
+    combos, weights = compiled.live(dead_mask)
+
+    c1 = np.array([a for a, _ in combos], dtype=np.int64)
+    c2 = np.array([b for _, b in combos], dtype=np.int64)
+    return c1, c2, np.cumsum(np.array(weights, dtype=float))
+
+
+def _deal_range(c1, c2, cum_weights, rows, dead, rng, max_tries=50):
+    """
+    Arpoo rangesta käden riveille `rows` niin, ettei se törmää rivin
+    kuolleisiin kortteihin (hylkäysotanta = suodatettu painotettu valinta).
+    Rivit, jotka ovat yhä blokattuja max_tries kierroksen jälkeen, arvotaan
+    suoraan suodatetusta jakaumasta (kuten WeightedSampler.sample), joten
+    vain rivit, joilla koko range on blokattu, jäävät pois.
+    Palauttaa (rivit, kortti1, kortti2) onnistuneille riveille.
+    """
+    done_rows, done_c1, done_c2 = [], [], []
+    pending = rows
+
+    for _ in range(max_tries):
+        if not len(pending):
+            break
+
+        r = rng.random(len(pending)) * cum_weights[-1]
+        idx = np.minimum(np.searchsorted(cum_weights, r), len(cum_weights) - 1)
+        a, b = c1[idx], c2[idx]
+
+        ok = ~(dead[pending, a] | dead[pending, b])
+        done_rows.append(pending[ok])
+        done_c1.append(a[ok])
+        done_c2.append(b[ok])
+        pending = pending[~ok]
+
+    if len(pending):
+        # suodatettu jakauma: blokattujen combojen paino nollaksi
+        weights = np.diff(cum_weights, prepend=0.0)
+        live = ~(dead[pending][:, c1] | dead[pending][:, c2])
+        cum = np.cumsum(weights * live, axis=1)
+        total = cum[:, -1]
+
+        has_live = total > 0
+        pending, cum, total = pending[has_live], cum[has_live], total[has_live]
+
+        r = (1.0 - rng.random(len(pending))) * total
+        idx = np.minimum((cum < r[:, None]).sum(axis=1), len(cum_weights) - 1)
+        done_rows.append(pending)
+        done_c1.append(c1[idx])
+        done_c2.append(c2[idx])
+
+    if not done_rows:
+        empty = np.zeros(0, dtype=np.int64)
+        return empty, empty, empty
+
+    return np.concatenate(done_rows), np.concatenate(done_c1), np.concatenate(done_c2)
+
+
+# ======================================================
+# BATCH-SIMULAATIO
+# ======================================================
+
+def simulate_postflop_batch(
+    hero_hand,
+    fixed_board,
+    opponents,
+    n,
+    rng,
+    batch_evaluator,
+    hero_strategy=None,
+    range_cache=None,
+):
+    """
+    Simuloi n kättä kerralla.
+    Palauttaa (tuloskoodit, exit-streetit, nettotulos bb) taulukkoina;
+    exit-street on indeksi EXIT_STREETS-tupleen.
+    """
+    if hero_strategy is None:
+        hero_strategy = HeroStrategyProfile()
+    if range_cache is None:
+        range_cache = RangeCache()
+
+    aggr = hero_strategy.aggression
+    rows_all = np.arange(n)
+    k = len(opponents)
+
+    result = np.full(n, -1, dtype=np.int64)
+    exit_street = np.full(n, EXIT_INDEX["showdown"], dtype=np.int64)
+    net = np.zeros(n)
+
+    hero_invested = np.full(n, BB)
+    pot_size = np.full(n, SB + BB)
+    hero_stack = np.full(n, STACK - BB)
+
+    fixed_mask = 0
+    for c in list(hero_hand) + list(fixed_board):
+        fixed_mask |= 1 << c
+
+    dead = np.zeros((n, 52), dtype=bool)
+    dead[:, list(hero_hand) + list(fixed_board)] = True
+
+    # ==================================================
+    # PRE-FLOP
+    # ==================================================
+    opp_c1 = np.zeros((n, k), dtype=np.int64)
+    opp_c2 = np.zeros((n, k), dtype=np.int64)
+    active = np.zeros((n, k), dtype=bool)
+    profiles = []
+
+    for j, (player, position) in enumerate(opponents):
+        profile = player.get_profile(position)
+        profiles.append(profile)
+
+        plays = rng.random(n) <= profile.vpip / 100.0
+        compiled = range_cache.get(profile, position)
+        c1, c2, cum_weights = _range_arrays(compiled, fixed_mask)
+        if not len(c1):
+            continue
+
+        rows, a, b = _deal_range(c1, c2, cum_weights, rows_all[plays], dead, rng)
+        opp_c1[rows, j] = a
+        opp_c2[rows, j] = b
+        dead[rows, a] = True
+        dead[rows, b] = True
+        active[rows, j] = True
+
+    fold_flop = np.array([p.fold_flop for p in profiles], dtype=float)
+    fold_turn = np.array([p.fold_turn for p in profiles], dtype=float)
+    opp_aggr = np.array([p.aggression / 100.0 for p in profiles], dtype=float)
+
+    open_ = active.any(axis=1)
+    result[~open_] = WIN_NOSHOWDOWN
+    exit_street[~open_] = EXIT_INDEX["preflop"]
+    net[~open_] = (pot_size - hero_invested)[~open_]
+
+    # --- board runout: satunnaiset elävät kortit ---
+    need = 5 - len(fixed_board)
+    board = np.empty((n, 5), dtype=np.int64)
+    board[:, :len(fixed_board)] = fixed_board
+    if need:
+        keys = rng.random((n, 52))
+        keys[dead] = 2.0
+        board[:, len(fixed_board):] = np.argsort(keys, axis=1)[:, :need]
+
+    hero = np.broadcast_to(np.array(hero_hand, dtype=np.int64), (n, 2))
+
+    def evaluate(cards, street_len, rows):
+        return batch_evaluator.evaluate(
+            np.concatenate([cards[rows], board[rows, :street_len]], axis=1)
+        )
+
+    def opp_cards(j):
+        return np.stack([opp_c1[:, j], opp_c2[:, j]], axis=1)
+
+    # ==================================================
+    # FLOP / TURN
+    # ==================================================
+    for street, street_len, pressure in (("flop", 3, 1), ("turn", 4, 2)):
+        live = np.nonzero(open_)[0]
+        texture = np.zeros(n, dtype=np.int64)
+        texture[live] = board_texture(board[live, :street_len])
+
+        n_active = active.sum(axis=1)
+        is_heads_up = n_active == 1
+
+        bet = np.minimum(
+            street_bet_size(street, pot_size, texture, aggr), hero_stack
+        )
+
+        hero_strength = np.zeros(n, dtype=np.int64)
+        hero_strength[live] = strength_bucket(evaluate(hero, street_len, live))
+
+        folds = fold_flop if street == "flop" else fold_turn
+        opp_fold = (active * folds).sum(axis=1) / np.maximum(1, 100 * n_active)
+        if street == "flop":
+            opp_fold = np.clip(opp_fold, 0.25, 0.55)
+
+        if street == "flop":
+            base_continue = np.where(is_heads_up, 0.80, 0.55)
+        else:
+            base_continue = np.where(is_heads_up, 0.70, 0.45)
+
+        continues = (
+            (rng.random(n) < base_continue)
+            | hero_should_continue(street, pressure, opp_fold, texture)
+        )
+        gives_up = open_ & (hero_strength == 0) & ~continues
+        result[gives_up] = LOSS_NOSHOWDOWN
+        exit_street[gives_up] = EXIT_INDEX[street]
+        net[gives_up] = -hero_invested[gives_up]
+        open_ &= ~gives_up
+
+        hero_invested = np.where(open_, hero_invested + bet, hero_invested)
+        hero_stack = np.where(open_, hero_stack - bet, hero_stack)
+        pot_size = np.where(open_, pot_size + bet, pot_size)
+
+        for j in range(k):
+            rows = np.nonzero(open_ & active[:, j])[0]
+            if not len(rows):
+                continue
+
+            strength = call_strength_bucket(evaluate(opp_cards(j), street_len, rows))
+            calls = opponent_calls(
+                strength, street, pot_size[rows], bet[rows], texture[rows],
+                pressure, opp_aggr[j], rng,
+            )
+
+            active[rows[~calls], j] = False
+            pot_size[rows[calls]] += bet[rows[calls]]
+
+        # flopilla kaikki foldaa → voitto; turnilla jatketaan riverille
+        if street == "flop":
+            everyone_folded = open_ & ~active.any(axis=1)
+            result[everyone_folded] = WIN_NOSHOWDOWN
+            exit_street[everyone_folded] = EXIT_INDEX["flop"]
+            net[everyone_folded] = (pot_size - hero_invested)[everyone_folded]
+            open_ &= ~everyone_folded
+
+    # ==================================================
+    # RIVER
+    # ==================================================
+    live = np.nonzero(open_)[0]
+
+    hero_value = np.zeros(n, dtype=np.int64)
+    hero_value[live] = evaluate(hero, 5, live)
+    hero_strength = strength_bucket(hero_value)
+
+    n_active = active.sum(axis=1)
+    is_heads_up = n_active == 1
+
+    # --- D1: HU showdown ---
+    pot_pressure = pot_size / np.maximum(1.0, pot_size + hero_stack)
+    base_sd_prob = np.select(
+        [hero_strength == 0, hero_strength == 1, hero_strength == 2, hero_strength == 3],
+        [0.05, 0.15, 0.35, 0.65], 0.0,
+    )
+    sd_prob = np.minimum(0.85, base_sd_prob + 0.4 * pot_pressure)
+    force_showdown = is_heads_up & (rng.random(n) < sd_prob)
+
+    bluff_freq = np.where(is_heads_up, HU_RIVER_PROFILE["bluff_freq"], MW_RIVER_PROFILE["bluff_freq"])
+    value_bet_thin = np.where(is_heads_up, HU_RIVER_PROFILE["value_bet_thin"], MW_RIVER_PROFILE["value_bet_thin"])
+
+    texture = np.zeros(n, dtype=np.int64)
+    texture[live] = board_texture(board[live])
+    bet = np.minimum(street_bet_size("river", pot_size, texture, aggr), hero_stack)
+
+    # --- 1) OPPONENT BETS ---
+    opp_value = np.full((n, k), np.iinfo(np.int64).max)
+    opp_strength = np.zeros((n, k), dtype=np.int64)
+    betters = np.zeros((n, k), dtype=bool)
+    first_better_aggr = np.zeros(n)
+
+    for j in range(k):
+        rows = np.nonzero(open_ & active[:, j])[0]
+        if not len(rows):
+            continue
+
+        opp_value[rows, j] = evaluate(opp_cards(j), 5, rows)
+        opp_strength[rows, j] = strength_bucket(opp_value[rows, j])
+
+        hu = is_heads_up[rows]
+        strong = opp_strength[rows, j] >= 2
+        value_prob = np.where(hu, np.where(strong, 0.65, 0.20), np.where(strong, 0.70, 0.0))
+        bluff_prob = np.where(
+            hu,
+            0.35 * (0.5 + opp_aggr[j]),
+            MW_RIVER_PROFILE["bluff_freq"] * (0.5 + opp_aggr[j]),
+        )
+
+        bets = rng.random(len(rows)) < value_prob + bluff_prob
+        bet_rows = rows[bets]
+        first = bet_rows[~betters[bet_rows].any(axis=1)]
+        first_better_aggr[first] = opp_aggr[j]
+        betters[bet_rows, j] = True
+
+    facing_bet = open_ & betters.any(axis=1)
+
+    # --- 2) HERO FACES BET ---
+    pot_odds = bet / np.maximum(1.0, pot_size + bet)
+    est_equity = np.select(
+        [hero_strength == 0, hero_strength == 1, hero_strength == 2, hero_strength == 3],
+        [0.05, 0.25, 0.55, 0.80], 0.0,
+    )
+    bluff_pressure = np.minimum(0.25, bluff_freq * (0.5 + first_better_aggr))
+    hu_calls = np.minimum(0.95, est_equity + bluff_pressure) >= pot_odds
+
+    call_down = np.where(is_heads_up, HU_RIVER_PROFILE["call_down"], MW_RIVER_PROFILE["call_down"])
+    mw_calls = (hero_strength >= 2) | (
+        (hero_strength == 1) & (rng.random(n) < call_down * hero_strategy.call_down)
+    )
+
+    hero_calls = facing_bet & np.where(is_heads_up, hu_calls, mw_calls)
+    hero_invested = np.where(hero_calls, hero_invested + bet, hero_invested)
+    hero_stack = np.where(hero_calls, hero_stack - bet, hero_stack)
+    pot_size = np.where(hero_calls, pot_size + bet, pot_size)
+    active = np.where(hero_calls[:, None], betters, active)
+    force_showdown |= hero_calls
+
+    # --- 3) EI BETTIÄ → HERO BET / CHECK ---
+    checked_to = open_ & ~facing_bet
+
+    r = rng.random(n)
+    hero_bets = np.select(
+        [hero_strength >= 3, hero_strength == 2, hero_strength == 1],
+        [True, r < value_bet_thin, r < bluff_freq * hero_strategy.bluff_freq],
+        False,
+    ) & checked_to
+    call_prob = np.select(
+        [hero_strength >= 3, hero_strength == 2, hero_strength == 1],
+        [0.75, 0.55, 0.35], 0.0,
+    )
+
+    hero_invested = np.where(hero_bets, hero_invested + bet, hero_invested)
+    hero_stack = np.where(hero_bets, hero_stack - bet, hero_stack)
+    pot_size = np.where(hero_bets, pot_size + bet, pot_size)
+
+    callers = (
+        active
+        & (opp_strength >= hero_strength[:, None])
+        & (rng.random((n, k)) < call_prob[:, None])
+        & hero_bets[:, None]
+    )
+    pot_size = pot_size + callers.sum(axis=1) * bet
+    has_callers = callers.any(axis=1)
+
+    active = np.where(has_callers[:, None], callers, active)
+    force_showdown = np.where(
+        checked_to,
+        np.where(hero_bets, has_callers, is_heads_up),
+        force_showdown,
+    )
+
+    no_showdown = open_ & ~force_showdown
+    result[no_showdown] = WIN_NOSHOWDOWN
+    exit_street[no_showdown] = EXIT_INDEX["river"]
+    net[no_showdown] = (pot_size - hero_invested)[no_showdown]
+    open_ &= force_showdown
+
+    # ==================================================
+    # SHOWDOWN
+    # ==================================================
+    best_opp = np.where(active, opp_value, np.iinfo(np.int64).max).min(axis=1)
+
+    lost = open_ & (best_opp < hero_value)
+    tied = open_ & (best_opp == hero_value)
+    won = open_ & ~lost & ~tied
+
+    result[lost] = LOSS
+    net[lost] = -hero_invested[lost]
+    result[tied] = TIE
+    net[tied] = (pot_size / 2 - hero_invested)[tied]
+    result[won] = WIN
+    net[won] = (pot_size - hero_invested)[won]
+
+    return result, exit_street, net
+
+
+_BATCH_EVALUATOR = None
+
+
+def get_batch_evaluator() -> BatchEvaluator:
+    """Yksi BatchEvaluator per prosessi (myös process poolin workereissa)."""
+    global _BATCH_EVALUATOR
+    if _BATCH_EVALUATOR is None:
+        _BATCH_EVALUATOR = BatchEvaluator()
+    return _BATCH_EVALUATOR
+
+
+def accumulate_batch(code, exit_street, net) -> ResultAccumulator:
+    """
+    Batchin tulokset ResultAccumulatoriksi (samat kentät kuin run_chunkissa).
+    """
+    acc = ResultAccumulator()
+    sq = net * net
+
+    for i in range(len(OUTCOMES)):
+        rows = code == i
+        acc.counts[i] = int(rows.sum())
+        acc.sums[i] = float(net[rows].sum())
+        acc.sums_sq[i] = float(sq[rows].sum())
+
+    for i in range(len(EXIT_STREETS)):
+        rows = exit_street == i
+        acc.street_counts[i] = int(rows.sum())
+        acc.street_sums[i] = float(net[rows].sum())
+        acc.street_sums_sq[i] = float(sq[rows].sum())
+
+    acc.total_net_bb = float(net.sum())
+    acc.total_net_bb_sq = float(sq.sum())
+    acc.chunks = 1
+    return acc
+
+
+def simulate_chunk_batch(config: SimulationConfig, opponents, hands, seed,
+                         hero_strategy=None, range_cache=None) -> ResultAccumulator:
+    """
+    run_chunkin numpy-haara: yksi chunk = yksi batch omalla seedillään.
+    """
+    _require_numpy()
+
+    rng = np.random.default_rng(seed)
+    code, exit_street, net = simulate_postflop_batch(
+        config.hero_hand, config.board, opponents, hands, rng,
+        get_batch_evaluator(), hero_strategy, range_cache,
+    )
+    return accumulate_batch(code, exit_street, net)
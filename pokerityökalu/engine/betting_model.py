@@ -1,6 +1,6 @@
 ﻿import random
-from treys import Evaluator
 from engine.board_logic import hand_strength_bucket
+from engine.evaluator import get_evaluator
 
 
 def opponent_call_decision(
@@ -12,14 +12,23 @@ def opponent_call_decision(
     texture: str,
     pressure: int,
     aggression: float = 0.5,
+    evaluator=None,
+    strength=None,
+    rng=random,
 ):
     """
     Returns:
         (calls: bool, call_amount: float)
+
+    strength: valmiiksi laskettu bucket (esim. StreetContextista);
+    jos None, käsi evaluoidaan tässä.
+    rng: satunnaislähde (oletuksena globaali random).
     """
 
-    evaluator = Evaluator()
-    strength = hand_strength_bucket(hand, board, evaluator)
+    if strength is None:
+        if evaluator is None:
+            evaluator = get_evaluator()
+        strength = hand_strength_bucket(hand, board, evaluator)
 
     # ============================
     # POT ODDS
@@ -67,7 +76,7 @@ def opponent_call_decision(
     # FLOP-FLOAT AIRILLA (KRITTINEN)
     # ============================
     if strength == 0 and street == "flop":
-        if random.random() < 0.10:
+        if rng.random() < 0.10:
             return True, bet_amount
 
     # ============================
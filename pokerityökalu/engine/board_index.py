@@ -0,0 +1,151 @@
+﻿# -*- coding: utf-8 -*-
+
+"""
+Valmiiksi laskettu board-indeksi kaikille 3-, 4- ja 5-kortin boardeille.
+
+Jokaiselle boardille tallennetaan yksi tavu:
+    bitit 0-1: board_texture  (0 = dry, 1 = semi, 2 = wet)
+    bitti 2:   detect_draws["flush_draw"]
+    bitti 3:   detect_draws["straight_draw"]
+    bitit 4-5: classify_flop_texture (vain 3 kortin boardit)
+
+Avain on järjestetyn korttijoukon colex-indeksi (kombinatorinen
+lukujärjestelmä), joten taulu on tiheä: C(52, k) tavua per koko.
+Taulut rakennetaan kerran, tallennetaan DATA_DIR:iin ja ladataan
+mmapilla, jolloin simulaattori tekee streetillä vain yhden haun.
+"""
+
+import mmap
+import os
+from itertools import combinations
+from math import comb
+from pathlib import Path
+
+from engine.config import DATA_DIR
+
+
+BOARD_SIZES = (3, 4, 5)
+
+TEXTURES = ("dry", "semi", "wet")
+FLOP_CLASSES = ("dry", "wet", "paired", "monotone")
+
+# BINOM[c][i] = C(c, i)
+BINOM = [[comb(c, i) for i in range(6)] for c in range(52)]
+
+
+def board_code(board) -> int:
+    """
+    Järjestetyn boardin colex-indeksi välillä [0, C(52, len(board))).
+    """
+    code = 0
+    for i, c in enumerate(sorted(board)):
+        code += BINOM[c][i + 1]
+    return code
+
+
+def build_table(size: int) -> bytearray:
+    # viitetoteutukset; tuodaan tässä, jotta simulator voi tuoda tämän moduulin
+    from engine.board_logic import classify_flop_texture
+    from engine.simulator import board_texture, detect_draws
+
+    table = bytearray(comb(52, size))
+    binom = BINOM
+
+    for board in combinations(range(52), size):
+        board = list(board)
+        draws = detect_draws(board)
+
+        info = TEXTURES.index(board_texture(board))
+        if draws["flush_draw"]:
+            info |= 1 << 2
+        if draws["straight_draw"]:
+            info |= 1 << 3
+        if size == 3:
+            info |= FLOP_CLASSES.index(classify_flop_texture(board)) << 4
+
+        # combinations() antaa kortit jo järjestyksessä
+        code = 0
+        for i, c in enumerate(board):
+            code += binom[c][i + 1]
+        table[code] = info
+
+    return table
+
+
+def table_path(size: int, data_dir=None) -> Path:
+    return Path(data_dir or DATA_DIR) / f"board_index_{size}.bin"
+
+
+def build_board_index(data_dir=None) -> None:
+    """
+    Rakentaa ja tallentaa kaikki taulut (kestää jonkin aikaa, ajetaan kerran).
+    """
+    for size in BOARD_SIZES:
+        path = table_path(size, data_dir)
+        path.parent.mkdir(parents=True, exist_ok=True)
+
+        # workerit voivat rakentaa samaan aikaan: oma väliaikaistiedosto
+        # per prosessi, os.replace vaihtaa valmiin taulun atomisesti
+        tmp_path = path.with_suffix(f".{os.getpid()}.tmp")
+        tmp_path.write_bytes(build_table(size))
+        os.replace(tmp_path, path)
+
+
+class BoardIndex:
+    """
+    mmapilla ladattu board-indeksi.
+    """
+
+    def __init__(self, data_dir=None):
+        self._files = []
+        self._tables = {}
+
+        for size in BOARD_SIZES:
+            path = table_path(size, data_dir)
+            if not path.exists() or path.stat().st_size != comb(52, size):
+                build_board_index(data_dir)
+
+            f = open(path, "rb")
+            self._files.append(f)
+            self._tables[size] = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+    def info(self, board) -> int:
+        return self._tables[len(board)][board_code(board)]
+
+    def texture(self, board) -> str:
+        if len(board) < 3:
+            return "dry"
+        return TEXTURES[self.info(board) & 3]
+
+    def draws(self, board) -> dict:
+        if len(board) < 3:
+            return {"flush_draw": False, "straight_draw": False}
+
+        info = self.info(board)
+        return {
+            "flush_draw": bool(info & (1 << 2)),
+            "straight_draw": bool(info & (1 << 3)),
+        }
+
+    def flop_class(self, board) -> str:
+        """classify_flop_texture: katsoo vain kolmea ensimmäistä korttia."""
+        return FLOP_CLASSES[(self.info(board[:3]) >> 4) & 3]
+
+    def close(self):
+        for table in self._tables.values():
+            table.close()
+        for f in self._files:
+            f.close()
+        self._tables = {}
+        self._files = []
+
+
+_BOARD_INDEX = None
+
+
+def get_board_index() -> BoardIndex:
+    """Prosessin jaettu indeksi (rakennetaan levylle, jos puuttuu)."""
+    global _BOARD_INDEX
+    if _BOARD_INDEX is None:
+        _BOARD_INDEX = BoardIndex()
+    return _BOARD_INDEX
@@ -3,26 +3,34 @@
 import random
 from typing import List, Optional
 
+from engine.cards import RANKS, to_treys
+from engine.eval_cache import cards_mask
 
-RANK_ORDER = "23456789TJQKA"
+
+RANK_ORDER = RANKS
+
+# Korttiluvut: rank = c >> 2, suit = c & 3 (ks. engine.cards)
+RANK_A = 12
+RANKS_KQ = (11, 10)
+RANKS_JT9 = (9, 8, 7)
 
 
 def hand_board_weight(
-    hand: List[str],
-    board: List[str],
-    hero_hand: Optional[List[str]] = None
+    hand: List[int],
+    board: List[int],
+    hero_hand: Optional[List[int]] = None
 ) -> float:
     """
     Board-aware + hero-blocker-aware painotus vastustajan k�delle.
     """
 
-    ranks = [c[0] for c in hand]
-    suits = [c[1] for c in hand]
+    ranks = [c >> 2 for c in hand]
+    suits = [c & 3 for c in hand]
 
-    board_ranks = [c[0] for c in board]
-    board_suits = [c[1] for c in board]
+    board_ranks = [c >> 2 for c in board]
+    board_suits = [c & 3 for c in board]
 
-    hero_suits = [c[1] for c in hero_hand] if hero_hand else []
+    hero_suits = [c & 3 for c in hero_hand] if hero_hand else []
 
     weight = 1.0
 
@@ -37,19 +45,19 @@ def hand_board_weight(
             flush_suit = s
             break
 
-    hand_flush_cards = suits.count(flush_suit) if flush_suit else 0
+    hand_flush_cards = suits.count(flush_suit) if flush_suit is not None else 0
     hero_flush_cards = hero_suits.count(flush_suit) if hero_hand else 0
 
     # --- 2. Flush-board logiikka ---
-    if flush_suit:
+    if flush_suit is not None:
         if hand_flush_cards >= 2:
-            high_rank = max(ranks, key=lambda r: RANK_ORDER.index(r))
+            high_rank = max(ranks)
 
-            if high_rank == "A":
+            if high_rank == RANK_A:
                 weight *= 3.0
-            elif high_rank in ["K", "Q"]:
+            elif high_rank in RANKS_KQ:
                 weight *= 2.2
-            elif high_rank in ["J", "T", "9"]:
+            elif high_rank in RANKS_JT9:
                 weight *= 1.6
             else:
                 weight *= 1.2
@@ -73,7 +81,7 @@ def hand_board_weight(
     # --- 4. T�ysin ohi ---
     if (
         not any(r in board_ranks for r in ranks)
-        and not flush_suit
+        and flush_suit is None
     ):
         weight *= 0.5
 
@@ -81,8 +89,8 @@ def hand_board_weight(
 
 
 def opponent_survives_street(
-    hand: List[str],
-    board: List[str],
+    hand: List[int],
+    board: List[int],
     street: str
 ) -> bool:
     """
@@ -124,8 +132,8 @@ def classify_flop_texture(board):
 
     flop = board[:3]
 
-    ranks = [c[0] for c in flop]
-    suits = [c[1] for c in flop]
+    ranks = [c >> 2 for c in flop]
+    suits = [c & 3 for c in flop]
 
     # MONOTONE
     if len(set(suits)) == 1:
@@ -136,19 +144,13 @@ def classify_flop_texture(board):
         return "paired"
 
     # Suoranveto?
-    rank_order = "23456789TJQKA"
-    idx = sorted(rank_order.index(r) for r in ranks)
-
-    if max(idx) - min(idx) <= 4:
+    if max(ranks) - min(ranks) <= 4:
         return "wet"
 
     # Muuten kuiva
     return "dry"
 
-from treys import Card as TreysCard
-
-
-def hand_strength_bucket(hand, board, evaluator):
+def hand_strength_bucket(hand, board, evaluator, cache=None):
     """
     Palauttaa bucketin:
     0 = air
@@ -157,11 +159,19 @@ def hand_strength_bucket(hand, board, evaluator):
     3 = strong
     """
 
-    board_cards = [TreysCard.new(c) for c in board]
-    hand_cards = [TreysCard.new(c) for c in hand]
+    if cache is not None:
+        value = cache.rank(
+            cards_mask(board) | cards_mask(hand), to_treys(board), hand, evaluator,
+        )
+    else:
+        value = evaluator.evaluate(to_treys(board), to_treys(hand))
+    return bucket_from_value(value)
 
-    value = evaluator.evaluate(board_cards, hand_cards)
 
+def bucket_from_value(value: int) -> int:
+    """
+    hand_strength_bucket valmiiksi lasketusta treys-arvosta.
+    """
     # Treys: pienempi = parempi käsi
     if value <= 300:
         return 3      # erittäin vahva (full house+)
@@ -0,0 +1,146 @@
+﻿# -*- coding: utf-8 -*-
+
+"""
+Kompakti korttiesitys.
+
+Kortti on kokonaisluku 0..51:
+    card = rank * 4 + suit
+    rank = card >> 2   (0 = "2" ... 12 = "A")
+    suit = card & 3    (0 = "s", 1 = "h", 2 = "d", 3 = "c")
+
+Järjestys on sama kuin vanhassa merkkijonopakassa
+([r + s for r in RANKS for s in SUITS]), joten indeksit vastaavat toisiaan.
+Merkkijonot ("Ah") parsitaan vain reunalla (SimulationConfig).
+"""
+
+import random
+from typing import Iterable, List
+
+from treys import Card as TreysCard
+
+
+RANKS = "23456789TJQKA"
+SUITS = "shdc"
+
+CARD_STRINGS = [r + s for r in RANKS for s in SUITS]
+CARD_INDEX = {s: i for i, s in enumerate(CARD_STRINGS)}
+
+# treys-kokonaisluvut lasketaan kerran, ei jokaisella evaluoinnilla
+TREYS_CARDS = [TreysCard.new(s) for s in CARD_STRINGS]
+
+
+def make_card(rank: int, suit: int) -> int:
+    return rank * 4 + suit
+
+
+def card_rank(card: int) -> int:
+    return card >> 2
+
+
+def card_suit(card: int) -> int:
+    return card & 3
+
+
+def parse_card(card) -> int:
+    """
+    Hyväksyy "Ah"-merkkijonon tai valmiin kokonaislukukortin.
+    """
+    if isinstance(card, int):
+        if 0 <= card < 52:
+            return card
+        raise ValueError(f"Virheellinen kortti: {card}")
+
+    try:
+        return CARD_INDEX[card[0].upper() + card[1:].lower()]
+    except (KeyError, IndexError, TypeError):
+        raise ValueError(f"Virheellinen kortti: {card!r}") from None
+
+
+def parse_cards(cards: Iterable) -> List[int]:
+    return [parse_card(c) for c in cards]
+
+
+def card_str(card: int) -> str:
+    return CARD_STRINGS[card]
+
+
+def cards_str(cards: Iterable[int]) -> List[str]:
+    return [CARD_STRINGS[c] for c in cards]
+
+
+def to_treys(cards: Iterable[int]) -> List[int]:
+    return [TREYS_CARDS[c] for c in cards]
+
+
+# =====================================================
+# PAKKA (bittimaski + indeksipuskuri)
+# =====================================================
+
+ALL_CARDS = tuple(range(52))
+FULL_MASK = (1 << 52) - 1
+
+
+class Deck:
+    """
+    Pakka 52-bittisenä live-korttimaskina ja uudelleenkäytettävänä
+    indeksipuskurina. Elävät kortit ovat puskurin alussa (_cards[:size]),
+    ja _index kertoo kortin paikan, joten remove() on O(1) vaihto
+    viimeisen elävän kortin kanssa. draw() on osittainen Fisher–Yates:
+    arvontoja tehdään vain nostettujen korttien verran.
+
+    dead_mask (kaikki pakasta poistetut kortit) on sama maski, jolla
+    rangearvonta suodattaa combot. Sama Deck-olio kelpaa kädestä toiseen
+    reset():llä ilman uusia listoja.
+    """
+
+    __slots__ = ("live_mask", "size", "_cards", "_index")
+
+    def __init__(self, dead: Iterable[int] = ()):
+        self._cards = list(ALL_CARDS)
+        self._index = list(ALL_CARDS)
+        self.reset(dead)
+
+    def reset(self, dead: Iterable[int] = ()) -> "Deck":
+        self._cards[:] = ALL_CARDS
+        self._index[:] = ALL_CARDS
+        self.size = 52
+        self.live_mask = FULL_MASK
+        for card in dead:
+            self.remove(card)
+        return self
+
+    def __len__(self) -> int:
+        return self.size
+
+    def __contains__(self, card: int) -> bool:
+        return bool(self.live_mask >> card & 1)
+
+    @property
+    def dead_mask(self) -> int:
+        return FULL_MASK ^ self.live_mask
+
+    def remove(self, card: int) -> None:
+        bit = 1 << card
+        if not self.live_mask & bit:
+            raise ValueError(f"Kortti ei ole pakassa: {card_str(card)}")
+        self.live_mask ^= bit
+
+        cards, index = self._cards, self._index
+        last = self.size - 1
+        i = index[card]
+        other = cards[last]
+
+        cards[i] = other
+        index[other] = i
+        cards[last] = card
+        index[card] = last
+        self.size = last
+
+    def draw(self, n: int, rng=random) -> List[int]:
+        """n satunnaista elävää korttia; nostetut poistetaan pakasta."""
+        drawn = []
+        for _ in range(n):
+            card = self._cards[rng.randrange(self.size)]
+            self.remove(card)
+            drawn.append(card)
+        return drawn
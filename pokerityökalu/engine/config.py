@@ -1,18 +1,81 @@
-﻿from dataclasses import dataclass
+﻿import os
+from dataclasses import dataclass
+from pathlib import Path
 from typing import List, Optional
 
+from engine.cards import parse_cards
 from engine.positional_player import PositionalPlayer
 
 
+# Valmiiksi lasketut taulut (board-indeksi ym.)
+DATA_DIR = Path(
+    os.environ.get("POKER_DATA_DIR", Path(__file__).resolve().parent / "data")
+)
+
+
 @dataclass
 class SimulationConfig:
     hero_hand: list
     position: str
     board: list
-    mode: str
+    mode: str   # "PLAY" tai "EXACT" (tarkka showdown-equity turn/river-boardilla)
 
     iterations: int = 5000
     random_seed: Optional[int] = None
 
     # 🔴 TÄMÄ PUUTTUI → nyt lisätty
     opponent_profiles: Optional[List[PositionalPlayer]] = None
+
+    # "treys" tai "lookup" (ks. engine.evaluator.EVALUATOR_BACKENDS)
+    evaluator_backend: str = "treys"
+
+    # "python" = simulate_postflop_once käsi kerrallaan
+    # "numpy"  = vektoroitu batch-moottori (engine.batch_simulator)
+    engine: str = "python"
+    batch_size: int = 20000
+
+    # Rinnakkaisajo: iteraatiot jaetaan chunk_size-kokoisiin paloihin
+    # (numpy-moottorilla batch_size), joilla kullakin oma seed.
+    workers: int = 1
+    chunk_size: int = 1000
+
+    # Rank-arvojen LRU-välimuistin koko (0 = pois päältä)
+    eval_cache_size: int = 100_000
+
+    # Board-tekstuuri ja vedot valmiista indeksistä (engine.board_index)
+    use_board_index: bool = False
+
+    # Sekventiaalinen pysäytys: opp-count lopetetaan, kun bb/100:n 95 %
+    # luottamusvälin leveys alittaa tavoitteen (iterations = yläraja).
+    target_ci_width: Optional[float] = None
+    min_iterations: int = 1000
+
+    # run_simulation_with_strategies: kaikki strategiat pelaavat samat kädet
+    # samoilla satunnaisluvuilla (common random numbers) ja EV-erot
+    # raportoidaan parittaisella keskivirheellä
+    paired_strategies: bool = False
+
+    # Nested-jako: jokainen käsi jaetaan kerran kaikille vastustajille ja
+    # ratkaistaan jokaiselle vastustajamäärälle samoilla korteilla ja
+    # satunnaisluvuilla; runout arvotaan uudelleen vain, jos lisätyn
+    # vastustajan kortit osuvat siihen (vain python-moottori; ei
+    # tulosvälimuistia eikä instrumentointia)
+    nested_opponents: bool = False
+
+    # Hot-path-instrumentointi (engine.instrumentation, vain python-moottori)
+    # ja konsolitulosteet; oletuksena hiljainen kirjastokäyttöä varten,
+    # CLI:t asettavat verbose=True
+    instrument: bool = False
+    verbose: bool = False
+
+    # Tulosvälimuisti levyllä (engine.result_cache, SQLite): toistuvat
+    # skenaariot luetaan välimuistista ja puuttuvat kädet ajetaan lisää
+    # (vain kiinteällä random_seedillä)
+    result_cache_path: Optional[str] = None
+    result_cache_max_entries: Optional[int] = None
+    result_cache_max_mb: Optional[float] = None
+
+    def __post_init__(self):
+        # Ainoa paikka jossa "Ah"-merkkijonot muunnetaan korttiluvuiksi
+        self.hero_hand = parse_cards(self.hero_hand)
+        self.board = parse_cards(self.board or [])
@@ -0,0 +1,90 @@
+﻿# -*- coding: utf-8 -*-
+
+"""
+Rajattu LRU-välimuisti käsien rank-arvoille.
+
+Avain on käden ja boardin yhteinen 52-bittinen korttimaski, joten sama
+korttijoukko osuu samaan avaimeen korttien järjestyksestä riippumatta.
+Arvo on treysin rank, joka on sama kaikilla evaluator-backendeilla,
+joten välimuisti voidaan jakaa koko prosessille.
+"""
+
+from collections import OrderedDict
+
+from engine.cards import to_treys
+
+
+class EvalCache:
+
+    def __init__(self, maxsize: int = 100_000):
+        self.maxsize = maxsize
+        self._values = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def __len__(self):
+        return len(self._values)
+
+    def rank(self, key: int, board_cards, hand, evaluator) -> int:
+        """
+        key: korttimaski (board | hand), board_cards: treys-kortit.
+        """
+        values = self._values
+        value = values.get(key)
+
+        if value is not None:
+            self.hits += 1
+            values.move_to_end(key)
+            return value
+
+        self.misses += 1
+        value = evaluator.evaluate(board_cards, to_treys(hand))
+
+        values[key] = value
+        if len(values) > self.maxsize:
+            values.popitem(last=False)
+            self.evictions += 1
+
+        return value
+
+    def stats(self) -> dict:
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "size": len(self._values),
+        }
+
+
+_CACHES = {}
+
+
+def get_eval_cache(maxsize: int):
+    """
+    Prosessin jaettu välimuisti annetulle kokorajalle (None jos 0).
+    """
+    if not maxsize:
+        return None
+
+    cache = _CACHES.get(maxsize)
+    if cache is None:
+        cache = EvalCache(maxsize)
+        _CACHES[maxsize] = cache
+    return cache
+
+
+def cards_mask(cards) -> int:
+    mask = 0
+    for c in cards:
+        mask |= 1 << c
+    return mask
+
+
+def format_cache_stats(hits: int, misses: int, evictions: int) -> str:
+    lookups = hits + misses
+    hit_rate = hits / lookups * 100 if lookups else 0.0
+    return (
+        f"hits={hits} | misses={misses} | evictions={evictions} | "
+        f"hit rate={hit_rate:.1f}%"
+    )
@@ -0,0 +1,47 @@
+﻿# -*- coding: utf-8 -*-
+
+"""
+Prosessin yhteiset käsievaluaattorit.
+
+treys.Evaluator() rakentaa lookup-taulunsa konstruktorissa, joten
+instanssi luodaan kerran per prosessi ja jaetaan betting modelille,
+river-logiikalle ja showdownille.
+"""
+
+from treys import Evaluator
+
+from engine.lookup_evaluator import LookupEvaluator
+
+
+# Kaikki backendit palauttavat treysin rank-arvot (pienempi = parempi)
+EVALUATOR_BACKENDS = {
+    "treys": Evaluator,
+    "lookup": LookupEvaluator,
+}
+
+_EVALUATORS = {}
+
+EVALUATOR_STATS = {"created": 0}
+
+
+def get_evaluator(backend: str = "treys"):
+    """
+    Palauttaa jaetun evaluaattorin (rakennetaan ensimmäisellä kutsulla).
+    """
+    evaluator = _EVALUATORS.get(backend)
+    if evaluator is not None:
+        return evaluator
+
+    try:
+        factory = EVALUATOR_BACKENDS[backend]
+    except KeyError:
+        raise ValueError(f"Tuntematon evaluator-backend: {backend}") from None
+
+    evaluator = factory()
+    EVALUATOR_STATS["created"] += 1
+    _EVALUATORS[backend] = evaluator
+    return evaluator
+
+
+def evaluator_instances_created() -> int:
+    return EVALUATOR_STATS["created"]
@@ -0,0 +1,214 @@
+﻿# -*- coding: utf-8 -*-
+
+"""
+Tarkka showdown-equity turn- ja river-boardeille (SimulationConfig.mode = "EXACT").
+
+Kun boardilla on jo 4 tai 5 korttia, jäljellä olevat runoutit (0 tai 1
+korttia) ja vastustajien elävät combot voidaan käydä läpi kokonaan:
+
+- jokainen (runout, combo) evaluoidaan kerran ja rank jaetaan kaikkien
+  vastustajien kesken, joilla sama combo on rangessa
+- vastustajat jaetaan istumajärjestyksessä kuten simulaattorissa: combon
+  todennäköisyys on sen paino jaettuna vastustajan elävien combojen
+  painosummalla (hero, board ja aiempien vastustajien kortit pois)
+- runout on tasajakautunut jäljellä olevista korteista
+
+Tulos on showdown-equity ilman otantakohinaa. VPIP:tä ja panostusta ei
+mallinneta: kaikki vastustajat ovat mukana showdownissa, joten EV-kentät
+(ev_per_hand, bb_per_100, showdown/non-showdown EV ja keskivirheet) eivät
+ole määriteltyjä ja ovat NaN (run_batchin JSONissa null).
+"""
+
+import math
+from typing import List
+
+from engine.cards import to_treys
+from engine.config import SimulationConfig
+from engine.evaluator import get_evaluator
+from engine.models import SimulationResult
+from engine.range_generator import RangeCache
+from engine.simulator import resolve_seed
+from engine.utils import assert_unique_cards, derive_seed
+
+
+# kuten legacy-preflop-combinatoriikassa: tuloavaruus kasvaa tulona
+EXACT_MAX_OPPONENTS = 2
+
+
+def _runouts(dead_mask: int, board_len: int):
+    if board_len == 5:
+        return [None]
+    if board_len == 4:
+        return [c for c in range(52) if not dead_mask >> c & 1]
+    raise ValueError("EXACT-moodi vaatii turn- tai river-boardin (4 tai 5 korttia)")
+
+
+def exact_showdown_equity(hero_hand, board, opponent_ranges, evaluator) -> dict:
+    """
+    opponent_ranges: lista CompiledRange-olioita (yksi per vastustaja,
+    istumajärjestyksessä).
+
+    Palauttaa {"equity", "win", "tie", "loss", "matchups", "wins", "ties", "losses"}:
+    equity/win/tie/loss ovat painotettuja osuuksia (0..1), wins/ties/losses
+    painottamattomia (matchup, runout) -lukumääriä.
+    """
+    base_mask = 0
+    for c in list(hero_hand) + list(board):
+        base_mask |= 1 << c
+
+    runouts = _runouts(base_mask, len(board))
+
+    # --- rankit: kerran per (runout, combo) ---
+    hero_ranks = {}
+    combo_ranks = {}    # runout -> {combo: rank}
+    for runout in runouts:
+        full_board = list(board) + ([runout] if runout is not None else [])
+        board_cards = to_treys(full_board)
+        hero_ranks[runout] = evaluator.evaluate(board_cards, to_treys(hero_hand))
+        combo_ranks[runout] = {}
+
+    live_ranges = []
+    for compiled in opponent_ranges:
+        live = [
+            (combo, mask, weight)
+            for combo, mask, weight in zip(compiled.combos, compiled.masks, compiled.weights)
+            if not mask & base_mask
+        ]
+        live_ranges.append(live)
+
+        for runout in runouts:
+            runout_mask = 1 << runout if runout is not None else 0
+            full_board = to_treys(list(board) + ([runout] if runout is not None else []))
+            ranks = combo_ranks[runout]
+            for combo, mask, _ in live:
+                if combo not in ranks and not mask & runout_mask:
+                    ranks[combo] = evaluator.evaluate(full_board, to_treys(combo))
+
+    totals = {"win": 0.0, "tie": 0.0, "loss": 0.0, "equity": 0.0, "weight": 0.0}
+    counts = {"wins": 0, "ties": 0, "losses": 0, "matchups": 0}
+
+    def resolve(combos, weight, dead_mask):
+        live_runouts = [
+            r for r in runouts if r is None or not dead_mask >> r & 1
+        ]
+        if not live_runouts:
+            return
+
+        counts["matchups"] += 1
+        share_weight = weight / len(live_runouts)
+
+        for runout in live_runouts:
+            hero_rank = hero_ranks[runout]
+            ranks = combo_ranks[runout]
+
+            best = min(ranks[combo] for combo in combos)
+
+            if best < hero_rank:
+                totals["loss"] += share_weight
+                counts["losses"] += 1
+            elif best == hero_rank:
+                tied = sum(1 for combo in combos if ranks[combo] == hero_rank)
+                totals["tie"] += share_weight
+                totals["equity"] += share_weight / (tied + 1)
+                counts["ties"] += 1
+            else:
+                totals["win"] += share_weight
+                totals["equity"] += share_weight
+                counts["wins"] += 1
+
+        totals["weight"] += weight
+
+    def enumerate_matchups(i, combos, weight, dead_mask):
+        if i == len(live_ranges):
+            resolve(combos, weight, dead_mask)
+            return
+
+        # peräkkäinen jako (WeightedSampler): P(combo) = w / elävien painosumma
+        live = [(combo, mask, w) for combo, mask, w in live_ranges[i] if not mask & dead_mask]
+        live_weight = sum(w for _, _, w in live)
+
+        for combo, mask, w in live:
+            enumerate_matchups(
+                i + 1, combos + (combo,), weight * w / live_weight, dead_mask | mask,
+            )
+
+    enumerate_matchups(0, (), 1.0, base_mask)
+
+    total = totals["weight"]
+    result = dict(counts)
+    for key in ("equity", "win", "tie", "loss"):
+        result[key] = totals[key] / total if total else 0.0
+    return result
+
+
+def run_exact_equity(config: SimulationConfig) -> List[SimulationResult]:
+    """
+    Tarkka showdown-equity vastustajamäärille 1..len(opponent_profiles).
+    SimulationResult.equity on tarkka equity (%), wins/losses/ties
+    painottamattomat (matchup, runout) -lukumäärät ja hands niiden summa
+    (läpikäydyt showdownit, ei käsiä). EV-kentät ovat NaN: panostusta ei
+    mallinneta.
+
+    Enintään EXACT_MAX_OPPONENTS vastustajaa; muuten ValueError, jotta
+    results[k - 1] vastaa aina k vastustajaa.
+    """
+    assert_unique_cards(config.hero_hand, config.board)
+
+    max_opps = min(6, len(config.opponent_profiles))
+    if max_opps > EXACT_MAX_OPPONENTS:
+        raise ValueError(
+            f"EXACT-moodi on rajattu {EXACT_MAX_OPPONENTS} vastustajaan "
+            f"(annettu {max_opps})"
+        )
+
+    evaluator = get_evaluator(config.evaluator_backend)
+
+    # sama seedin ratkaisu kuin run_simulationissa → samat ranget
+    range_cache = RangeCache(derive_seed(resolve_seed(config), "ranges"))
+
+    hero_position = config.position or "BTN"
+    results = []
+
+    for opp_count in range(1, max_opps + 1):
+        ranges = [
+            range_cache.get(player.get_profile(hero_position), hero_position)
+            for player in config.opponent_profiles[:opp_count]
+        ]
+
+        exact = exact_showdown_equity(config.hero_hand, config.board, ranges, evaluator)
+
+        if config.verbose:
+            print(
+                f"[EXACT] Opps={opp_count} | "
+                f"equity={exact['equity'] * 100:.2f}% | "
+                f"win={exact['win'] * 100:.2f}% | "
+                f"tie={exact['tie'] * 100:.2f}% | "
+                f"matchups={exact['matchups']}"
+            )
+
+        showdowns = exact["wins"] + exact["ties"] + exact["losses"]
+
+        results.append(
+            SimulationResult(
+                opponents=opp_count,
+                wins=exact["wins"],
+                losses=exact["losses"],
+                ties=exact["ties"],
+                equity=round(exact["equity"] * 100, 2),
+                non_showdown_win_pct=0.0,
+                showdown_win_pct=round(exact["win"] * 100, 2),
+                hands=showdowns,
+                ev_per_hand=math.nan,
+                ev_se=math.nan,
+                bb_per_100=math.nan,
+                bb_per_100_se=math.nan,
+                showdown_ev=math.nan,
+                showdown_ev_se=math.nan,
+                non_showdown_ev=math.nan,
+                non_showdown_ev_se=math.nan,
+                sd_freq=100.0,
+                exit_streets={"showdown": showdowns},
+            )
+        )
+
+    return results
@@ -3,6 +3,9 @@
 
 
 class HeroStrategyProfile:
+
+    __slots__ = ("aggression", "bluff_freq", "call_down")
+
     def __init__(
         self,
         aggression: float = 1.0,     # bet sizing & bluff freq
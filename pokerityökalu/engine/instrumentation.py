@@ -0,0 +1,167 @@
+﻿# -*- coding: utf-8 -*-
+
+"""
+Valinnainen instrumentointi simulaattorin kuumalle polulle.
+
+Instrumentation-olio kulkee simulate_postflop_oncelle parametrina; kun
+sitä ei anneta (None), simulaattori tekee vain None-tarkistukset eikä
+mitään muuta. Kerätään:
+
+- exitit streeteittäin (preflop / flop / turn / river / showdown)
+- rank-haut eval-välimuistista (eval_lookups) ja niistä evaluaattorille
+  menneet ohitukset (evaluator_calls, CountingEvaluator); lämpimässä
+  prosessissa evaluator_calls voi olla 0, vaikka hakuja on paljon
+- rangearvonnat: combot yhteensä vs dead-korttien blokkaamat
+- "turvallisen deck-poiston" continue-haaran osumat
+- aika per street joka sample_every:nnestä kädestä (perf_counter)
+
+Olio on picklattava, joten workerit palauttavat sen chunkin mukana ja
+osat yhdistetään merge():llä.
+"""
+
+from time import perf_counter
+
+
+STREETS = ("preflop", "flop", "turn", "river", "showdown")
+TIMED_STREETS = ("preflop", "flop", "turn", "river")
+
+
+class Instrumentation:
+
+    def __init__(self, sample_every: int = 64):
+        self.sample_every = max(1, sample_every)
+
+        self.hands = 0
+        self.exits = {street: 0 for street in STREETS}
+        self.eval_lookups = 0
+        self.evaluator_calls = 0
+
+        self.range_draws = 0
+        self.range_combos = 0
+        self.range_dead_combos = 0
+        self.range_empty = 0
+        self.safe_removal_skips = 0
+
+        self.timed_hands = 0
+        self.street_time = {street: 0.0 for street in TIMED_STREETS}
+        self.street_timed = {street: 0 for street in TIMED_STREETS}
+
+        self._marks = None
+
+    # -------------------------------------------------
+    # KÄSI
+    # -------------------------------------------------
+
+    def start_hand(self) -> bool:
+        """Palauttaa True, jos tämän käden streetit ajastetaan."""
+        self.hands += 1
+        if self.hands % self.sample_every:
+            self._marks = None
+            return False
+
+        self._marks = [("preflop", perf_counter())]
+        return True
+
+    def mark(self, street: str) -> None:
+        """Streetin alku (vain ajastetuissa käsissä)."""
+        if self._marks is not None:
+            self._marks.append((street, perf_counter()))
+
+    def end_hand(self, exit_street) -> None:
+        self.exits[exit_street or "showdown"] += 1
+
+        marks = self._marks
+        if marks is None:
+            return
+
+        marks.append((None, perf_counter()))
+        for (street, start), (_, end) in zip(marks, marks[1:]):
+            self.street_time[street] += end - start
+            self.street_timed[street] += 1
+        self.timed_hands += 1
+        self._marks = None
+
+    # -------------------------------------------------
+    # RANGEARVONTA
+    # -------------------------------------------------
+
+    def range_draw(self, compiled, dead_mask: int) -> None:
+        self.range_draws += 1
+        self.range_combos += len(compiled.masks)
+        self.range_dead_combos += sum(1 for m in compiled.masks if m & dead_mask)
+
+    # -------------------------------------------------
+    # YHDISTÄMINEN + RAPORTTI
+    # -------------------------------------------------
+
+    def merge(self, other: "Instrumentation") -> "Instrumentation":
+        for name in (
+            "hands", "eval_lookups", "evaluator_calls", "range_draws", "range_combos",
+            "range_dead_combos", "range_empty", "safe_removal_skips", "timed_hands",
+        ):
+            setattr(self, name, getattr(self, name) + getattr(other, name))
+
+        for street in STREETS:
+            self.exits[street] += other.exits[street]
+        for street in TIMED_STREETS:
+            self.street_time[street] += other.street_time[street]
+            self.street_timed[street] += other.street_timed[street]
+        return self
+
+    def report(self) -> dict:
+        hands = self.hands
+        return {
+            "hands": hands,
+            "exits": dict(self.exits),
+            "eval_lookups": self.eval_lookups,
+            "eval_lookups_per_hand": self.eval_lookups / hands if hands else 0.0,
+            "evaluator_calls": self.evaluator_calls,
+            "evaluator_calls_per_hand": self.evaluator_calls / hands if hands else 0.0,
+            "range_draws": self.range_draws,
+            "range_combos": self.range_combos,
+            "range_dead_combos": self.range_dead_combos,
+            "range_dead_pct": (
+                self.range_dead_combos / self.range_combos * 100
+                if self.range_combos else 0.0
+            ),
+            "range_empty": self.range_empty,
+            "safe_removal_skips": self.safe_removal_skips,
+            "timed_hands": self.timed_hands,
+            "street_us": {
+                street: (
+                    self.street_time[street] / self.street_timed[street] * 1e6
+                    if self.street_timed[street] else 0.0
+                )
+                for street in TIMED_STREETS
+            },
+        }
+
+
+def format_report(report: dict) -> str:
+    exits = " ".join(f"{street}={count}" for street, count in report["exits"].items())
+    timing = " ".join(f"{street}={us:.1f}µs" for street, us in report["street_us"].items())
+    return (
+        f"exits: {exits} | "
+        f"eval lookups/hand={report['eval_lookups_per_hand']:.2f} | "
+        f"evaluator calls (cache misses)/hand={report['evaluator_calls_per_hand']:.2f} | "
+        f"dead combos={report['range_dead_pct']:.1f}% | "
+        f"empty ranges={report['range_empty']} | "
+        f"safe-removal skips={report['safe_removal_skips']} | "
+        f"time/street: {timing}"
+    )
+
+
+class CountingEvaluator:
+    """
+    Evaluaattorin kääre, joka laskee evaluate-kutsut. Eval-välimuistin
+    kanssa vain ohitukset päätyvät tänne. Käytetään vain, kun
+    instrumentointi on päällä.
+    """
+
+    def __init__(self, evaluator, instrumentation: Instrumentation):
+        self._evaluator = evaluator
+        self._instrumentation = instrumentation
+
+    def evaluate(self, board, hand):
+        self._instrumentation.evaluator_calls += 1
+        return self._evaluator.evaluate(board, hand)
@@ -0,0 +1,107 @@
+﻿# -*- coding: utf-8 -*-
+
+"""
+Maa-isomorfia: (hero, board, dead) -avaimen normalisointi.
+
+Maiden permutaatio ei muuta mitään strategista (kädet, textuurit ja
+equityt ovat samat), joten välimuistit ja taulut voidaan avata
+kanoniseen muotoon: 22 100 flopista jää 1 755 erilaista.
+
+Jokaiselle maalle lasketaan allekirjoitus (rank-maskit boardissa,
+herolla ja dead-korteissa). Kaksi korttijoukkoa ovat isomorfiset
+täsmälleen silloin, kun allekirjoitusten multijoukot ovat samat, joten
+maat järjestetään allekirjoituksen mukaan ja numeroidaan uudelleen.
+Samanlaiset allekirjoitukset ovat keskenään vaihdettavissa, joten
+järjestys niiden välillä ei vaikuta avaimeen.
+"""
+
+from collections import Counter
+from functools import lru_cache
+from itertools import combinations
+
+
+def suit_map(hero=(), board=(), dead=()) -> tuple:
+    """
+    Palauttaa maakuvauksen: suit_map[alkuperäinen maa] = kanoninen maa.
+    """
+    return _suit_map((board, hero, dead))
+
+
+def _suit_map(groups) -> tuple:
+    """Maakuvaus korttiryhmien allekirjoituksista (ryhmien järjestys kiinteä)."""
+    signatures = [[0] * len(groups) for _ in range(4)]
+    for group, cards in enumerate(groups):
+        for c in cards:
+            signatures[c & 3][group] |= 1 << (c >> 2)
+
+    order = sorted(range(4), key=signatures.__getitem__, reverse=True)
+
+    mapping = [0, 0, 0, 0]
+    for canonical, suit in enumerate(order):
+        mapping[suit] = canonical
+    return tuple(mapping)
+
+
+def apply_suit_map(cards, mapping) -> tuple:
+    """Kortit kanoniseen muotoon (järjestettynä)."""
+    return tuple(sorted((c & ~3) | mapping[c & 3] for c in cards))
+
+
+def invert_suit_map(mapping) -> tuple:
+    inverse = [0, 0, 0, 0]
+    for suit, canonical in enumerate(mapping):
+        inverse[canonical] = suit
+    return tuple(inverse)
+
+
+def canonicalize(hero=(), board=(), dead=()):
+    """
+    Palauttaa (key, mapping):
+        key     = (hero, board, dead) kanonisina, järjestettyinä tupleina
+        mapping = suit_map, jolla key saatiin (from_canonical kääntää)
+    """
+    mapping = suit_map(hero, board, dead)
+    key = (
+        apply_suit_map(hero, mapping),
+        apply_suit_map(board, mapping),
+        apply_suit_map(dead, mapping),
+    )
+    return key, mapping
+
+
+def canonicalize_streets(hero=(), board=()):
+    """
+    Kuten canonicalize, mutta boardin katujärjestys säilyy: flop on
+    järjestetty joukko, turn ja river pysyvät omilla paikoillaan.
+    Maakuvaus lasketaan flopin, turnin, riverin ja heron erillisistä
+    allekirjoituksista, joten samat kortit eri katujärjestyksessä antavat
+    eri avaimen.
+
+    Palauttaa ((hero, board), mapping).
+    """
+    mapping = _suit_map((board[:3], board[3:4], board[4:5], hero))
+    board_key = apply_suit_map(board[:3], mapping) + tuple(
+        (c & ~3) | mapping[c & 3] for c in board[3:]
+    )
+    return (apply_suit_map(hero, mapping), board_key), mapping
+
+
+def canonical_key(hero=(), board=(), dead=()) -> tuple:
+    return canonicalize(hero, board, dead)[0]
+
+
+def from_canonical(cards, mapping) -> tuple:
+    """Kanoniset kortit takaisin alkuperäisiin maihin."""
+    return apply_suit_map(cards, invert_suit_map(mapping))
+
+
+@lru_cache(maxsize=None)
+def canonical_boards(size: int) -> dict:
+    """
+    {kanoninen board: montako raakaboardia se edustaa}.
+    Painojen summa on C(52, size); flopilla avaimia on 1 755.
+    """
+    counts = Counter()
+    for board in combinations(range(52), size):
+        counts[apply_suit_map(board, suit_map(board=board))] += 1
+    return dict(counts)
@@ -0,0 +1,104 @@
+﻿# -*- coding: utf-8 -*-
+
+"""
+Taulupohjainen 5/6/7-kortin evaluaattori.
+
+Palauttaa samat rank-arvot kuin treys (1 = royal flush ... 7462 = 7-high),
+joten hand_strength_bucket-rajat toimivat sellaisenaan. Erona on, että
+6- ja 7-kortin käsiä ei käydä läpi 5-kortin osajoukkoina, vaan:
+
+- ei-värikädet: suora lookup rank-multisetin alkulukutulolla
+  (kaikki 5-, 6- ja 7-kortin multisetit lasketaan valmiiksi)
+- värit: suora lookup värimaan 13-bittisellä rank-maskilla
+
+Rajapinta on sama kuin treys.Evaluatorilla: evaluate(board, hand)
+treys-kokonaisluvuilla.
+"""
+
+from itertools import combinations, combinations_with_replacement
+
+from treys import Card as TreysCard
+from treys.lookup import LookupTable
+
+
+PRIMES = TreysCard.PRIMES
+
+
+def _prime_product(ranks) -> int:
+    product = 1
+    for r in ranks:
+        product *= PRIMES[r]
+    return product
+
+
+def build_tables():
+    """
+    Rakentaa (rank_lookup, flush_lookup):
+        rank_lookup:  {alkulukutulo: paras ei-väri rank}  (5-7 korttia)
+        flush_lookup: lista[8192], rank-maski -> paras väri rank (0 = ei väriä)
+    """
+    table = LookupTable()
+
+    # --- ei-värikädet: 5 kortin taulu treysiltä, 6 ja 7 johdetaan ---
+    rank_lookup = dict(table.unsuited_lookup)
+
+    for size in (6, 7):
+        for ranks in combinations_with_replacement(range(13), size):
+            if any(ranks.count(r) > 4 for r in set(ranks)):
+                continue
+
+            best = None
+            for i in range(size):
+                sub = ranks[:i] + ranks[i + 1:]
+                value = rank_lookup.get(_prime_product(sub))
+                if value is not None and (best is None or value < best):
+                    best = value
+
+            rank_lookup[_prime_product(ranks)] = best
+
+    # --- värit: maski -> paras 5 kortin väri ---
+    flush_lookup = [0] * (1 << 13)
+
+    for size in (5, 6, 7):
+        for ranks in combinations(range(13), size):
+            mask = 0
+            for r in ranks:
+                mask |= 1 << r
+
+            if size == 5:
+                flush_lookup[mask] = table.flush_lookup[_prime_product(ranks)]
+            else:
+                flush_lookup[mask] = min(
+                    flush_lookup[mask & ~(1 << r)] for r in ranks
+                )
+
+    return rank_lookup, flush_lookup
+
+
+class LookupEvaluator:
+    """
+    Drop-in korvaaja treys.Evaluatorille (evaluate-metodi).
+    """
+
+    def __init__(self):
+        self.rank_lookup, self.flush_lookup = build_tables()
+
+    def evaluate(self, board, hand) -> int:
+        cards = board + hand
+
+        prime = 1
+        suit_masks = [0] * 9   # treys-suit bitti: 1, 2, 4, 8
+        for c in cards:
+            prime *= c & 0xFF
+            suit_masks[(c >> 12) & 0xF] |= c >> 16
+
+        value = self.rank_lookup[prime]
+
+        if len(cards) >= 5:
+            flush_lookup = self.flush_lookup
+            for mask in suit_masks:
+                flush_value = flush_lookup[mask]
+                if flush_value and flush_value < value:
+                    value = flush_value
+
+        return value
@@ -1,6 +1,10 @@
 ﻿# -*- coding: utf-8 -*-
 
-from dataclasses import dataclass
+import math
+from dataclasses import dataclass, field
+from typing import Dict, Optional
+
+from engine.instrumentation import Instrumentation
 
 @dataclass
 class SimulationResult:
@@ -11,3 +15,259 @@ class SimulationResult:
     equity: float
     non_showdown_win_pct: float
     showdown_win_pct: float
+
+    # ===== EV (bb) =====
+    hands: int = 0
+    ev_per_hand: float = 0.0
+    ev_se: float = 0.0
+    bb_per_100: float = 0.0
+    bb_per_100_se: float = 0.0
+
+    # showdown / non-showdown: keskiarvo per käsi (EV-osuus) ja keskivirhe
+    showdown_ev: float = 0.0
+    showdown_ev_se: float = 0.0
+    non_showdown_ev: float = 0.0
+    non_showdown_ev_se: float = 0.0
+    sd_freq: float = 0.0
+
+    # exit-street -histogrammi: {"preflop": n, ..., "showdown": n}
+    exit_streets: Dict[str, int] = field(default_factory=dict)
+
+    # Instrumentation.report(), kun config.instrument on päällä
+    instrumentation: Optional[dict] = None
+
+
+# ======================================================
+# OSATULOKSET (chunkit / workerit / ajot)
+# ======================================================
+
+# Tuloskoodit samassa järjestyksessä kuin batch-moottorin WIN..LOSS_NOSHOWDOWN
+OUTCOMES = ("win", "loss", "tie", "win_noshowdown", "loss_noshowdown")
+OUTCOME_INDEX = {name: i for i, name in enumerate(OUTCOMES)}
+
+# simulate_postflop_once palauttaa streetin (None = showdown)
+EXIT_STREETS = ("preflop", "flop", "turn", "river", "showdown")
+EXIT_INDEX = {name: i for i, name in enumerate(EXIT_STREETS)}
+EXIT_INDEX[None] = EXIT_INDEX["showdown"]
+
+WIN, LOSS, TIE, WIN_NOSHOWDOWN, LOSS_NOSHOWDOWN = range(len(OUTCOMES))
+
+# 95 %:n luottamusväli
+Z_95 = 1.96
+
+
+def mean_and_se(total: float, total_sq: float, n: int):
+    """Keskiarvo ja sen keskivirhe summista."""
+    if n < 2:
+        return (total / n if n else 0.0), float("inf")
+    mean = total / n
+    variance = (total_sq - n * mean * mean) / (n - 1)
+    return mean, math.sqrt(max(variance, 0.0) / n)
+
+
+class ResultAccumulator:
+    """
+    Yhdistettävä osatulos: lukumäärät, summat ja neliösummat
+    tulostyypeittäin ja exit-streeteittäin kiinteissä listoissa.
+
+    Chunkit yhdistetään aina samassa järjestyksessä, joten float-summat
+    eivät riipu workerien määrästä.
+    """
+
+    __slots__ = (
+        "counts", "sums", "sums_sq",
+        "street_counts", "street_sums", "street_sums_sq",
+        "total_net_bb", "total_net_bb_sq",
+        "vpip_total", "vpip_played",
+        "eval_cache_hits", "eval_cache_misses", "eval_cache_evictions",
+        "chunks", "instrumentation",
+    )
+
+    def __init__(self):
+        self.counts = [0] * len(OUTCOMES)
+        self.sums = [0.0] * len(OUTCOMES)
+        self.sums_sq = [0.0] * len(OUTCOMES)
+
+        self.street_counts = [0] * len(EXIT_STREETS)
+        self.street_sums = [0.0] * len(EXIT_STREETS)
+        self.street_sums_sq = [0.0] * len(EXIT_STREETS)
+
+        self.total_net_bb = 0.0
+        self.total_net_bb_sq = 0.0
+
+        self.vpip_total = 0
+        self.vpip_played = 0
+        self.eval_cache_hits = 0
+        self.eval_cache_misses = 0
+        self.eval_cache_evictions = 0
+
+        # montako chunkkia on yhdistetty (jatkoajon seuraava chunk-indeksi)
+        self.chunks = 0
+        self.instrumentation = None
+
+    # -------------------------------------------------
+    # KIRJAUS
+    # -------------------------------------------------
+
+    def add(self, result: str, street, net_bb: float) -> None:
+        sq = net_bb * net_bb
+        self.total_net_bb += net_bb
+        self.total_net_bb_sq += sq
+
+        i = OUTCOME_INDEX[result]
+        self.counts[i] += 1
+        self.sums[i] += net_bb
+        self.sums_sq[i] += sq
+
+        s = EXIT_INDEX[street]
+        self.street_counts[s] += 1
+        self.street_sums[s] += net_bb
+        self.street_sums_sq[s] += sq
+
+    def merge(self, other: "ResultAccumulator") -> "ResultAccumulator":
+        for name in ("counts", "sums", "sums_sq", "street_counts", "street_sums", "street_sums_sq"):
+            mine, theirs = getattr(self, name), getattr(other, name)
+            for i, value in enumerate(theirs):
+                mine[i] += value
+
+        for name in (
+            "total_net_bb", "total_net_bb_sq", "vpip_total", "vpip_played",
+            "eval_cache_hits", "eval_cache_misses", "eval_cache_evictions", "chunks",
+        ):
+            setattr(self, name, getattr(self, name) + getattr(other, name))
+
+        # valinnainen Instrumentation kulkee chunkin mukana
+        if other.instrumentation is not None:
+            if self.instrumentation is None:
+                self.instrumentation = Instrumentation(other.instrumentation.sample_every)
+            self.instrumentation.merge(other.instrumentation)
+        return self
+
+    # -------------------------------------------------
+    # JOHDETUT LUVUT
+    # -------------------------------------------------
+
+    @property
+    def hands(self) -> int:
+        return sum(self.counts)
+
+    @property
+    def wins(self) -> int:
+        return self.counts[WIN] + self.counts[WIN_NOSHOWDOWN]
+
+    @property
+    def losses(self) -> int:
+        return self.counts[LOSS] + self.counts[LOSS_NOSHOWDOWN]
+
+    @property
+    def ties(self) -> int:
+        return self.counts[TIE]
+
+    @property
+    def showdown_wins(self) -> int:
+        return self.counts[WIN]
+
+    @property
+    def showdown_losses(self) -> int:
+        return self.counts[LOSS]
+
+    @property
+    def non_sd_wins(self) -> int:
+        return self.counts[WIN_NOSHOWDOWN]
+
+    @property
+    def sd_count(self) -> int:
+        return self.counts[WIN] + self.counts[LOSS] + self.counts[TIE]
+
+    @property
+    def nsd_count(self) -> int:
+        return self.counts[WIN_NOSHOWDOWN] + self.counts[LOSS_NOSHOWDOWN]
+
+    def _group_sums(self, outcomes):
+        return (
+            sum(self.sums[i] for i in outcomes),
+            sum(self.sums_sq[i] for i in outcomes),
+        )
+
+    @property
+    def showdown_net_bb(self) -> float:
+        return self._group_sums((WIN, LOSS, TIE))[0]
+
+    @property
+    def non_sd_net_bb(self) -> float:
+        return self._group_sums((WIN_NOSHOWDOWN, LOSS_NOSHOWDOWN))[0]
+
+    def ev(self):
+        """(EV/hand, keskivirhe)."""
+        return mean_and_se(self.total_net_bb, self.total_net_bb_sq, self.hands)
+
+    def group_ev(self, outcomes):
+        """
+        Ryhmän EV-osuus per käsi ja sen keskivirhe: ryhmän ulkopuoliset
+        kädet lasketaan nollana, joten osuudet summautuvat EV/handiksi.
+        """
+        total, total_sq = self._group_sums(outcomes)
+        return mean_and_se(total, total_sq, self.hands)
+
+    def exit_streets(self) -> dict:
+        return dict(zip(EXIT_STREETS, self.street_counts))
+
+    def progress(self, opp_count: int) -> dict:
+        """
+        Juokseva tilanne: EV/hand, bb/100 ja showdown-frekvenssi
+        keskivirheineen.
+        """
+        n = self.hands
+        ev, ev_se = self.ev()
+
+        sd_freq = self.sd_count / n if n else 0.0
+        sd_freq_se = math.sqrt(sd_freq * (1 - sd_freq) / n) if n else float("inf")
+
+        return {
+            "opponents": opp_count,
+            "hands": n,
+            "ev_per_hand": ev,
+            "ev_se": ev_se,
+            "bb_per_100": ev * 100,
+            "bb_per_100_se": ev_se * 100,
+            "ci_width": 2 * Z_95 * ev_se * 100,
+            "sd_freq": sd_freq * 100,
+            "sd_freq_se": sd_freq_se * 100,
+            "done": False,
+        }
+
+    def to_result(self, opp_count: int) -> SimulationResult:
+        n = self.hands
+
+        showdown_total = self.showdown_wins + self.showdown_losses
+        showdown_equity = self.showdown_wins / showdown_total * 100 if showdown_total else 0.0
+        non_sd_pct = self.non_sd_wins / n * 100 if n else 0.0
+
+        ev, ev_se = self.ev()
+        sd_ev, sd_ev_se = self.group_ev((WIN, LOSS, TIE))
+        nsd_ev, nsd_ev_se = self.group_ev((WIN_NOSHOWDOWN, LOSS_NOSHOWDOWN))
+
+        return SimulationResult(
+            opponents=opp_count,
+            wins=self.wins,
+            losses=self.losses,
+            ties=self.ties,
+            equity=round(showdown_equity, 2),
+            non_showdown_win_pct=round(non_sd_pct, 2),
+            showdown_win_pct=round(showdown_equity, 2),
+            hands=n,
+            ev_per_hand=ev,
+            ev_se=ev_se,
+            bb_per_100=ev * 100,
+            bb_per_100_se=ev_se * 100,
+            showdown_ev=sd_ev,
+            showdown_ev_se=sd_ev_se,
+            non_showdown_ev=nsd_ev,
+            non_showdown_ev_se=nsd_ev_se,
+            sd_freq=self.sd_count / n * 100 if n else 0.0,
+            exit_streets=self.exit_streets(),
+            instrumentation=(
+                self.instrumentation.report()
+                if self.instrumentation is not None else None
+            ),
+        )
@@ -3,22 +3,6 @@
 from dataclasses import dataclass
 from random import random
 
-class PlayerProfile:
-    def __init__(
-        self,
-        vpip=20,
-        aggression=30,
-        fold_flop=40,
-        fold_turn=50,
-        fold_river=60,
-    ):
-        self.vpip = vpip
-        self.aggression = aggression
-        self.fold_flop = fold_flop
-        self.fold_turn = fold_turn
-        self.fold_river = fold_river
-
-
 @dataclass
 class PlayerProfile:
     """
@@ -61,3 +45,29 @@ class PlayerProfile:
 
     def is_passive(self) -> bool:
         return self.aggression < 2.0
+
+
+class CompiledProfile:
+    """
+    Muuttumaton profiilitietue simulaation sisäsilmukalle yhdelle
+    (profiili, positio) -parille: prosentit valmiiksi todennäköisyyksinä
+    (0..1) ja käännetty range mukana, joten kädessä ei tehdä
+    profiilihakuja eikä jakolaskuja. Rakennetaan kerran per chunk
+    (range_generator.compile_opponents).
+    """
+
+    __slots__ = (
+        "profile", "position", "range",
+        "vpip", "aggression", "fold_flop", "fold_turn", "fold_river",
+    )
+
+    def __init__(self, profile: PlayerProfile, position: str, compiled_range):
+        self.profile = profile
+        self.position = position
+        self.range = compiled_range
+
+        self.vpip = profile.vpip / 100.0
+        self.aggression = profile.aggression / 100.0
+        self.fold_flop = profile.fold_flop / 100.0
+        self.fold_turn = profile.fold_turn / 100.0
+        self.fold_river = profile.fold_river / 100.0
@@ -0,0 +1,362 @@
+﻿# -*- coding: utf-8 -*-
+
+"""
+Pysyvä 169x169 preflop-equitytaulu (all-in, käsiluokka vs käsiluokka).
+
+Taulun solu (h, v) on heron luokan h equity luokkaa v vastaan keskiarvona
+kaikista yhteensopivista combopareista. Koska kaikki luokan combot ovat
+maapermutaatiolla samanarvoisia, hero voidaan kiinnittää yhteen
+edustajacomboon ja käydä läpi vain vastustajan combot; ne ryhmitellään
+edelleen maa-isomorfisiin variantteihin (esim. AKs vs QJs samaa/eri maata),
+ja jokainen variantti lasketaan kerran.
+
+Rakennus (build_preflop_table) laskee jokaisen variantin tarkasti kaikilla
+C(48, 5) boardilla numpy-batch-evaluaattorilla, rinnakkain ja
+checkpointaten (append-only JSONL), joten keskeytetty ajo jatkuu siitä
+mihin jäi. Valmis taulu tallennetaan binäärinä ja ladataan mmapilla:
+
+    header  8 tavua   b"PFEQ169\\0"
+    equity  169*169   float32  (0..1)
+    pairs   169*169   uint16   (yhteensopivien combo-parien määrä)
+
+Range vs range -equity on tällöin painotettu taulukkohaku.
+"""
+
+import json
+import mmap
+import os
+from concurrent.futures import ProcessPoolExecutor
+from itertools import chain, combinations
+from math import comb
+from pathlib import Path
+
+from engine.cards import RANKS, make_card
+from engine.config import DATA_DIR
+from engine.isomorphism import canonical_key
+from engine.ranges import generate_combos
+from engine.utils import derive_seed
+
+
+HEADER = b"PFEQ169\0"
+N_CLASSES = 169
+
+TABLE_PATH = DATA_DIR / "preflop_equity_169.bin"
+CHECKPOINT_PATH = DATA_DIR / "preflop_equity_169.checkpoint.jsonl"
+
+# Montako boardia evaluoidaan kerralla (muistiraja)
+BOARD_CHUNK = 250_000
+
+
+# =====================================================
+# KÄSILUOKAT (13x13-ruudukko, A ylhäällä)
+# =====================================================
+
+def _hand_classes():
+    order = RANKS[::-1]   # A, K, ..., 2
+    classes = []
+    for row, r1 in enumerate(order):
+        for col, r2 in enumerate(order):
+            if row == col:
+                classes.append(r1 + r2)
+            elif row < col:
+                classes.append(r1 + r2 + "s")
+            else:
+                classes.append(r2 + r1 + "o")
+    return classes
+
+
+# HAND_CLASSES[row * 13 + col]: diagonaali = parit, yläkolmio suited,
+# alakolmio offsuit
+HAND_CLASSES = _hand_classes()
+CLASS_INDEX = {code: i for i, code in enumerate(HAND_CLASSES)}
+
+
+def class_representative(code: str):
+    """Luokan edustajacombo (s/h-maat)."""
+    r1, r2 = RANKS.index(code[0]), RANKS.index(code[1])
+
+    if code.endswith("s"):
+        return make_card(r1, 0), make_card(r2, 0)
+    return make_card(r1, 0), make_card(r2, 1)
+
+
+def class_pair_variants(hero_code: str, villain_code: str):
+    """
+    Palauttaa (hero_combo, {vastustajacombo: lukumäärä}), jossa jokainen
+    maa-isomorfinen variantti on edustettuna yhdellä combolla.
+    """
+    hero_combo = class_representative(hero_code)
+    hero_mask = (1 << hero_combo[0]) | (1 << hero_combo[1])
+
+    variants = {}
+    for c1, c2 in generate_combos(villain_code):
+        if hero_mask >> c1 & 1 or hero_mask >> c2 & 1:
+            continue
+        key = canonical_key(hero_combo, dead=(c1, c2))
+        if key not in variants:
+            variants[key] = [(c1, c2), 0]
+        variants[key][1] += 1
+
+    return hero_combo, {combo: count for combo, count in variants.values()}
+
+
+# =====================================================
+# YKSITTÄINEN MATCHUP (numpy)
+# =====================================================
+
+_BOARD_POSITIONS = None
+
+
+def _all_board_positions():
+    """Kaikki 5 kortin indeksijoukot 48 elävästä kortista (uint8, cache)."""
+    global _BOARD_POSITIONS
+    if _BOARD_POSITIONS is None:
+        import numpy as np
+
+        n = comb(48, 5)
+        flat = np.fromiter(
+            chain.from_iterable(combinations(range(48), 5)),
+            dtype=np.uint8, count=n * 5,
+        )
+        _BOARD_POSITIONS = flat.reshape(n, 5)
+    return _BOARD_POSITIONS
+
+
+def matchup_equity(hero_combo, villain_combo, boards_per_matchup=None, seed=None) -> float:
+    """
+    Heron all-in equity (voitto + puolet tasapeleistä) vastustajan comboa vastaan.
+    boards_per_matchup=None → tarkka laskenta kaikilla boardeilla,
+    muuten satunnaisotos (seedattu).
+    """
+    import numpy as np
+    from engine.batch_simulator import get_batch_evaluator
+
+    evaluator = get_batch_evaluator()
+
+    dead = set(hero_combo) | set(villain_combo)
+    live = np.array([c for c in range(52) if c not in dead], dtype=np.int64)
+
+    if boards_per_matchup is None:
+        positions = _all_board_positions()
+    else:
+        rng = np.random.default_rng(seed)
+        positions = np.argsort(rng.random((boards_per_matchup, 48)), axis=1)[:, :5]
+
+    hero = np.array(hero_combo, dtype=np.int64)
+    villain = np.array(villain_combo, dtype=np.int64)
+
+    wins = ties = 0
+    for start in range(0, len(positions), BOARD_CHUNK):
+        boards = live[positions[start:start + BOARD_CHUNK]]
+        n = len(boards)
+
+        hero_value = evaluator.evaluate(np.concatenate([np.broadcast_to(hero, (n, 2)), boards], axis=1))
+        villain_value = evaluator.evaluate(np.concatenate([np.broadcast_to(villain, (n, 2)), boards], axis=1))
+
+        wins += int((hero_value < villain_value).sum())
+        ties += int((hero_value == villain_value).sum())
+
+    return (wins + ties * 0.5) / len(positions)
+
+
+def class_pair_equity(hero_index: int, villain_index: int, boards_per_matchup=None, seed=None):
+    """
+    Palauttaa (hero_index, villain_index, equity, pairs).
+    pairs = yhteensopivien combo-parien määrä koko luokkaparissa.
+    """
+    hero_code = HAND_CLASSES[hero_index]
+    villain_code = HAND_CLASSES[villain_index]
+
+    hero_combo, variants = class_pair_variants(hero_code, villain_code)
+    hero_combos = len(generate_combos(hero_code))
+
+    total = sum(variants.values())
+    equity = 0.0
+    for villain_combo, count in variants.items():
+        variant_seed = derive_seed(seed, hero_combo, villain_combo)
+        equity += count * matchup_equity(hero_combo, villain_combo, boards_per_matchup, variant_seed)
+
+    return hero_index, villain_index, equity / total if total else 0.5, hero_combos * total
+
+
+def _class_pair_task(args):
+    return class_pair_equity(*args)
+
+
+# =====================================================
+# RAKENNUS + CHECKPOINT
+# =====================================================
+
+def _checkpoint_header(settings: dict) -> str:
+    return json.dumps({"settings": settings}, sort_keys=True) + "\n"
+
+
+def _read_checkpoint(path: Path, settings: dict) -> dict:
+    """
+    Lukee valmiit luokkaparit. Ensimmäinen rivi on asetukset
+    (boards_per_matchup, seed); jos ne eroavat nykyisistä tai otsake
+    puuttuu, checkpoint aloitetaan alusta, jotta esim. otosajon tuloksia
+    ei kirjoiteta tarkkaan tauluun.
+    """
+    header = _checkpoint_header(settings)
+    done = {}
+
+    text = path.read_text(encoding="utf-8") if path.exists() else ""
+    if not text.startswith(header):
+        path.write_text(header, encoding="utf-8")
+        return done
+
+    if not text.endswith("\n"):
+        # keskeytynyt viimeinen rivi pois, jotta uudet rivit alkavat puhtaasti
+        text = text[:text.rfind("\n") + 1]
+        path.write_text(text, encoding="utf-8")
+
+    for line in text[len(header):].splitlines():
+        if line.strip():
+            row = json.loads(line)
+            done[(row["h"], row["v"])] = (row["equity"], row["pairs"])
+    return done
+
+
+def build_preflop_table(
+    path=None,
+    checkpoint_path=None,
+    workers: int = 1,
+    boards_per_matchup=None,
+    seed=None,
+    progress=None,
+):
+    """
+    Laskee kaikki luokkaparit h < v (loput symmetrialla: E(v, h) = 1 - E(h, v),
+    E(h, h) = 0.5) ja kirjoittaa binääritaulun. Jokainen valmis luokkapari
+    kirjataan checkpointiin heti, joten ajo voidaan keskeyttää ja jatkaa
+    samoilla asetuksilla. Checkpoint poistetaan, kun taulu on kirjoitettu.
+    """
+    path = Path(path or TABLE_PATH)
+    checkpoint_path = Path(checkpoint_path or CHECKPOINT_PATH)
+    checkpoint_path.parent.mkdir(parents=True, exist_ok=True)
+
+    settings = {"boards_per_matchup": boards_per_matchup, "seed": seed}
+    done = _read_checkpoint(checkpoint_path, settings)
+    tasks = [
+        (h, v, boards_per_matchup, seed)
+        for h in range(N_CLASSES)
+        for v in range(h + 1, N_CLASSES)
+        if (h, v) not in done
+    ]
+
+    executor = ProcessPoolExecutor(max_workers=workers) if workers > 1 else None
+    mapper = executor.map if executor is not None else map
+
+    try:
+        with open(checkpoint_path, "a", encoding="utf-8") as checkpoint:
+            for h, v, equity, pairs in mapper(_class_pair_task, tasks):
+                done[(h, v)] = (equity, pairs)
+                checkpoint.write(json.dumps({"h": h, "v": v, "equity": equity, "pairs": pairs}) + "\n")
+                checkpoint.flush()
+
+                if progress is not None:
+                    progress(len(done), N_CLASSES * (N_CLASSES - 1) // 2)
+    finally:
+        if executor is not None:
+            executor.shutdown()
+
+    write_table(path, done)
+    checkpoint_path.unlink()
+
+
+def write_table(path: Path, done: dict) -> None:
+    from array import array
+
+    equity = array("f", [0.0] * (N_CLASSES * N_CLASSES))
+    pairs = array("H", [0] * (N_CLASSES * N_CLASSES))
+
+    for h in range(N_CLASSES):
+        equity[h * N_CLASSES + h] = 0.5
+        pairs[h * N_CLASSES + h] = _same_class_pairs(HAND_CLASSES[h])
+
+    for (h, v), (eq, n) in done.items():
+        equity[h * N_CLASSES + v] = eq
+        equity[v * N_CLASSES + h] = 1.0 - eq
+        pairs[h * N_CLASSES + v] = n
+        pairs[v * N_CLASSES + h] = n
+
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_suffix(".tmp")
+    with open(tmp_path, "wb") as f:
+        f.write(HEADER)
+        equity.tofile(f)
+        pairs.tofile(f)
+    os.replace(tmp_path, path)
+
+
+def _same_class_pairs(code: str) -> int:
+    combos = generate_combos(code)
+    count = 0
+    for a, b in combos:
+        for c, d in combos:
+            if len({a, b, c, d}) == 4:
+                count += 1
+    return count
+
+
+# =====================================================
+# LATAUS (mmap)
+# =====================================================
+
+class PreflopEquityTable:
+    """
+    mmapilla ladattu 169x169-taulu. Ei vaadi numpya.
+    """
+
+    def __init__(self, path=None):
+        path = Path(path or TABLE_PATH)
+        self._file = open(path, "rb")
+        self._mm = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+
+        if self._mm[:len(HEADER)] != HEADER:
+            raise ValueError(f"Tuntematon preflop-taulun formaatti: {path}")
+
+        cells = N_CLASSES * N_CLASSES
+        start = len(HEADER)
+        view = memoryview(self._mm)
+        self._equity = view[start:start + 4 * cells].cast("f")
+        self._pairs = view[start + 4 * cells:start + 6 * cells].cast("H")
+
+    def equity(self, hero_code: str, villain_code: str) -> float:
+        return self._equity[CLASS_INDEX[hero_code] * N_CLASSES + CLASS_INDEX[villain_code]]
+
+    def pairs(self, hero_code: str, villain_code: str) -> int:
+        return self._pairs[CLASS_INDEX[hero_code] * N_CLASSES + CLASS_INDEX[villain_code]]
+
+    def range_vs_range(self, hero_range: dict, villain_range: dict) -> float:
+        """
+        Painotettu equity: rangepaino * rangepaino * yhteensopivat combo-parit.
+        Rangeina käy normalize_range / generate_profile_range -muoto.
+        """
+        total = weighted = 0.0
+        for hero_code, hero_weight in hero_range.items():
+            row = CLASS_INDEX[hero_code] * N_CLASSES
+            for villain_code, villain_weight in villain_range.items():
+                cell = row + CLASS_INDEX[villain_code]
+                w = hero_weight * villain_weight * self._pairs[cell]
+                weighted += w * self._equity[cell]
+                total += w
+        return weighted / total if total else 0.0
+
+    def close(self):
+        self._equity.release()
+        self._pairs.release()
+        self._mm.close()
+        self._file.close()
+
+
+_TABLE = None
+
+
+def get_preflop_table() -> PreflopEquityTable:
+    """Prosessin jaettu taulu (rakennettava ensin: cli/build_tables.py --preflop)."""
+    global _TABLE
+    if _TABLE is None:
+        _TABLE = PreflopEquityTable()
+    return _TABLE
@@ -0,0 +1,220 @@
+﻿# -*- coding: utf-8 -*-
+
+"""
+Preflop-sweep: kaikki 169 käsiluokkaa kaikissa positioissa yhtenä ajona.
+
+Tulos on 13x13-ruudukko (EV/hand ja bb/100 keskivirheineen) per
+(positio, vastustajamäärä). Ruudukon järjestys on sama kuin
+preflop_equity.HAND_CLASSES: A ylhäällä, diagonaali parit, yläkolmio
+suited, alakolmio offsuit.
+
+Verrattuna 169 × 6 erilliseen run_simulation-kutsuun:
+
+- solut ajetaan yhdessä process poolissa; workerit elävät koko ajon, joten
+  evaluaattori, eval-välimuisti ja käännetyt ranget (shared_range_cache)
+  rakennetaan kerran per prosessi eikä kerran per solu
+- kaikki solut käyttävät samaa base seediä: vastustajien ranget ovat samat
+  koko ruudukossa ja käsien erot lasketaan yhteisillä satunnaisluvuilla
+- solu on kokonainen run_chunks-ajo, joten target_ci_width pysäyttää
+  jokaisen solun erikseen
+
+Käsiluokasta ajetaan joko edustajacombo (oletus; tyhjällä boardilla luokan
+combot ovat maapermutaatiolla samanarvoisia) tai kaikki combot
+(all_combos=True), jolloin solun iteraatiot jaetaan comboille tasan
+(jakojäännös ensimmäisille comboille, joten summa on täsmälleen iterations)
+ja combojen chunkit jatkuvat toistensa perästä (eri seedit). Jos
+iteraatioita on vähemmän kuin comboja, loput combot jäävät ajamatta.
+Toteutunut käsimäärä on aina SimulationResult.hands.
+"""
+
+from concurrent.futures import FIRST_COMPLETED, wait
+from dataclasses import replace
+from typing import Dict, List, Optional, Tuple
+
+from engine.config import SimulationConfig
+from engine.models import ResultAccumulator, SimulationResult
+from engine.preflop_equity import HAND_CLASSES, class_representative
+from engine.range_generator import POSITIONAL_HAND_ORDER
+from engine.ranges import generate_combos
+from engine.simulator import chunk_sizes, resolve_seed, run_chunks, simulation_executor
+
+
+SWEEP_POSITIONS = tuple(POSITIONAL_HAND_ORDER)
+GRID_SIZE = 13
+
+
+# =====================================================
+# YKSI SOLU (positio, vastustajamäärä, käsiluokka)
+# =====================================================
+
+def sweep_cell(config: SimulationConfig, position: str, opp_count: int, hand_class: str,
+               base_seed: int, all_combos: bool = False) -> ResultAccumulator:
+    """
+    Ajaa yhden ruudukon solun ja palauttaa yhdistetyn osatuloksen.
+    Kutsutaan sekä pääprosessissa että process poolin workereissa.
+    """
+    if all_combos:
+        combos = generate_combos(hand_class)
+    else:
+        combos = [class_representative(hand_class)]
+
+    per_combo, extra = divmod(config.iterations, len(combos))
+
+    tally = ResultAccumulator()
+    first_chunk = 0
+
+    for i, combo in enumerate(combos):
+        hands = per_combo + (1 if i < extra else 0)
+        if hands == 0:
+            break
+
+        cell_config = replace(
+            config,
+            hero_hand=list(combo),
+            position=position,
+            board=[],
+            iterations=hands,
+            workers=1,
+            verbose=False,
+            result_cache_path=None,
+        )
+        tally.merge(run_chunks(cell_config, opp_count, base_seed, first_chunk=first_chunk))
+        first_chunk += len(chunk_sizes(cell_config))
+
+    return tally
+
+
+def _sweep_cell_task(args):
+    return sweep_cell(*args)
+
+
+# =====================================================
+# TULOS
+# =====================================================
+
+class PreflopSweep:
+    """
+    Sweepin tulokset: results[(positio, vastustajamäärä)] on 169 alkion
+    lista SimulationResulteja HAND_CLASSES-järjestyksessä.
+    """
+
+    def __init__(self, positions, opp_counts, base_seed: int):
+        self.positions = tuple(positions)
+        self.opp_counts = tuple(opp_counts)
+        self.base_seed = base_seed
+        self.results: Dict[Tuple[str, int], List[Optional[SimulationResult]]] = {
+            (position, opp_count): [None] * len(HAND_CLASSES)
+            for position in self.positions
+            for opp_count in self.opp_counts
+        }
+
+    def grid(self, position: str, opp_count: int, field: str = "bb_per_100") -> List[List[float]]:
+        """13x13-ruudukko annetusta SimulationResult-kentästä."""
+        cells = self.results[(position, opp_count)]
+        return [
+            [getattr(cells[row * GRID_SIZE + col], field) for col in range(GRID_SIZE)]
+            for row in range(GRID_SIZE)
+        ]
+
+    def to_dict(self) -> dict:
+        return {
+            "seed": self.base_seed,
+            "hand_classes": list(HAND_CLASSES),
+            "grids": [
+                {
+                    "position": position,
+                    "opponents": opp_count,
+                    "hands": self.grid(position, opp_count, "hands"),
+                    "ev_per_hand": self.grid(position, opp_count, "ev_per_hand"),
+                    "ev_se": self.grid(position, opp_count, "ev_se"),
+                    "bb_per_100": self.grid(position, opp_count, "bb_per_100"),
+                    "bb_per_100_se": self.grid(position, opp_count, "bb_per_100_se"),
+                }
+                for (position, opp_count) in self.results
+            ],
+        }
+
+
+def format_grid(sweep: PreflopSweep, position: str, opp_count: int,
+                field: str = "bb_per_100") -> str:
+    """Ruudukko tekstinä: jokaisessa solussa käsiluokka ja arvo."""
+    values = sweep.grid(position, opp_count, field)
+    lines = [f"{position} | opps={opp_count} | {field}"]
+    for row in range(GRID_SIZE):
+        lines.append(" ".join(
+            f"{HAND_CLASSES[row * GRID_SIZE + col]:>3} {values[row][col]:+7.1f}"
+            for col in range(GRID_SIZE)
+        ))
+    return "\n".join(lines)
+
+
+# =====================================================
+# SWEEP
+# =====================================================
+
+def run_preflop_sweep(config: SimulationConfig, positions=None, opp_counts=None,
+                      all_combos: bool = False, progress=None) -> PreflopSweep:
+    """
+    Ajaa kaikki käsiluokat annetuissa positioissa (oletus: kaikki
+    POSITIONAL_HAND_ORDER-positiot) ja vastustajamäärillä (oletus:
+    1..len(opponent_profiles), max 6).
+
+    config on pohja: hero_hand, position ja board korvataan soluittain;
+    iterations on kättä per solu ja workers process poolin koko.
+    progress(done, total) kutsutaan jokaisen valmistuneen solun jälkeen.
+    """
+    positions = tuple(positions or SWEEP_POSITIONS)
+    unknown = [p for p in positions if p not in POSITIONAL_HAND_ORDER]
+    if unknown:
+        raise ValueError(f"Tuntemattomat positiot: {', '.join(unknown)}")
+
+    max_opps = min(6, len(config.opponent_profiles or []))
+    if max_opps == 0:
+        raise ValueError("Sweep tarvitsee vähintään yhden vastustajaprofiilin")
+    opp_counts = tuple(opp_counts or range(1, max_opps + 1))
+    if any(not 1 <= n <= max_opps for n in opp_counts):
+        raise ValueError(f"Vastustajamäärän on oltava välillä 1..{max_opps}")
+
+    base_seed = resolve_seed(config)
+    sweep = PreflopSweep(positions, opp_counts, base_seed)
+
+    # positio kerrallaan: workerin käännetyt ranget pysyvät käytössä
+    tasks = [
+        ((position, opp_count), index,
+         (config, position, opp_count, hand_class, base_seed, all_combos))
+        for position in positions
+        for opp_count in opp_counts
+        for index, hand_class in enumerate(HAND_CLASSES)
+    ]
+    total = len(tasks)
+    done = 0
+
+    def store(key, index, tally):
+        nonlocal done
+        sweep.results[key][index] = tally.to_result(key[1])
+        done += 1
+        if progress is not None:
+            progress(done, total)
+
+    executor = simulation_executor(config)
+    if executor is None:
+        for key, index, args in tasks:
+            store(key, index, _sweep_cell_task(args))
+        return sweep
+
+    pending = {}
+    try:
+        for key, index, args in tasks:
+            pending[executor.submit(_sweep_cell_task, args)] = (key, index)
+
+            if len(pending) >= 2 * config.workers:
+                finished, _ = wait(pending, return_when=FIRST_COMPLETED)
+                for future in finished:
+                    store(*pending.pop(future), future.result())
+
+        for future in wait(pending).done:
+            store(*pending.pop(future), future.result())
+    finally:
+        executor.shutdown(cancel_futures=True)
+
+    return sweep
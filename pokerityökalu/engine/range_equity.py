@@ -0,0 +1,174 @@
+﻿# -*- coding: utf-8 -*-
+
+"""
+Range vs range -equitymatriisi kiinteällä boardilla.
+
+Kumpikin range laajennetaan comboiksi (CompiledRange), boardin kanssa
+törmäävät combot pudotetaan, ja kaikki jäljellä olevat runoutit käydään
+läpi tarkasti:
+
+- jokainen (runout, combo) evaluoidaan kerran numpy-batch-evaluaattorilla,
+  ja sama rank jaetaan heron ja vastustajan rangen kesken (sama combo
+  voi olla molemmissa)
+- matriisin solu (i, j) on hero-combon i equity (voitto + puolet
+  tasapeleistä) vastustajan comboa j vastaan keskiarvona runouteista,
+  jotka eivät törmää kumpaankaan comboon
+- törmäävät combo-parit ovat NaN
+
+Flopilla runouteja on C(47, 2) = 1081 per combo-pari, joten koko matriisi
+on yksi evaluointi per (runout, combo) eikä per käsi-simulaatio.
+"""
+
+from itertools import combinations
+
+from engine.batch_simulator import _require_numpy, get_batch_evaluator, np
+from engine.range_generator import CompiledRange
+from engine.ranges import normalize_range
+
+
+# Vertailutaulun (runout, hero, villain) kokoraja yhdellä kierroksella
+MAX_CELLS_PER_STEP = 4_000_000
+
+# Evaluoitavien 7 kortin rivien raja yhdellä kierroksella
+MAX_ROWS_PER_STEP = 500_000
+
+
+def _compile(range_input) -> CompiledRange:
+    if isinstance(range_input, CompiledRange):
+        return range_input
+    return CompiledRange(normalize_range(range_input))
+
+
+def _live_combos(compiled: CompiledRange, board_mask: int):
+    combos, weights = [], []
+    for combo, mask, weight in zip(compiled.combos, compiled.masks, compiled.weights):
+        if not mask & board_mask:
+            combos.append(combo)
+            weights.append(weight)
+    return combos, weights
+
+
+class EquityMatrix:
+    """
+    equity[i, j]: hero_combos[i] vs villain_combos[j] (0..1, NaN = törmäys).
+    """
+
+    def __init__(self, board, hero_combos, hero_weights, villain_combos, villain_weights, equity):
+        self.board = list(board)
+        self.hero_combos = hero_combos
+        self.hero_weights = np.asarray(hero_weights, dtype=np.float64)
+        self.villain_combos = villain_combos
+        self.villain_weights = np.asarray(villain_weights, dtype=np.float64)
+        self.equity = equity
+
+    def combo_equity(self):
+        """
+        Jokaisen hero-combon equity koko vastustajan rangea vastaan
+        (rangepainoilla, törmäävät combot pois). NaN jos mikään ei käy.
+        """
+        valid = ~np.isnan(self.equity)
+        weights = np.where(valid, self.villain_weights[None, :], 0.0)
+        total = weights.sum(axis=1)
+        weighted = np.where(valid, self.equity, 0.0) * weights
+
+        with np.errstate(invalid="ignore", divide="ignore"):
+            return weighted.sum(axis=1) / total
+
+    def range_equity(self) -> float:
+        """Heron koko rangen equity (molempien rangejen painot)."""
+        valid = ~np.isnan(self.equity)
+        weights = self.hero_weights[:, None] * self.villain_weights[None, :] * valid
+        total = weights.sum()
+        if not total:
+            return float("nan")
+        return float((np.where(valid, self.equity, 0.0) * weights).sum() / total)
+
+
+def _runout_ranks(board, runouts, combos, evaluator):
+    """
+    ranks[r, c] = treys-rank boardille + runout r + combo c,
+    -1 jos combo törmää runoutiin.
+    """
+    m, n = len(runouts), len(combos)
+    ranks = np.full((m, n), -1, dtype=np.int64)
+    if not n:
+        return ranks
+
+    combo_arr = np.array(combos, dtype=np.int64).reshape(n, 2)
+    board_arr = np.array(board, dtype=np.int64)
+
+    step = max(1, MAX_ROWS_PER_STEP // n)
+    for start in range(0, m, step):
+        chunk = runouts[start:start + step]
+        k = len(chunk)
+
+        cards = np.concatenate([
+            np.broadcast_to(board_arr, (k, n, len(board_arr))),
+            np.broadcast_to(chunk[:, None, :], (k, n, chunk.shape[1])),
+            np.broadcast_to(combo_arr[None, :, :], (k, n, 2)),
+        ], axis=2)
+
+        # törmäävissä riveissä sama kortti olisi kahdesti: ei evaluoida
+        open_rows = ~(chunk[:, None, :, None] == combo_arr[None, :, None, :]).any(axis=(2, 3))
+
+        block = ranks[start:start + k]
+        block[open_rows] = evaluator.evaluate(cards[open_rows])
+
+    return ranks
+
+
+def range_vs_range_equity(hero_range, villain_range, board) -> EquityMatrix:
+    """
+    hero_range / villain_range: generate_profile_range- tai normalize_range-
+    muoto (dict / lista) tai valmis CompiledRange. board: 3-5 korttia (int).
+    """
+    _require_numpy()
+
+    board = list(board)
+    if not 3 <= len(board) <= 5:
+        raise ValueError("Range vs range -matriisi vaatii 3-5 kortin boardin")
+
+    board_mask = 0
+    for c in board:
+        board_mask |= 1 << c
+
+    hero_combos, hero_weights = _live_combos(_compile(hero_range), board_mask)
+    villain_combos, villain_weights = _live_combos(_compile(villain_range), board_mask)
+
+    # --- yhteinen combotaulu: rank kerran per (runout, combo) ---
+    all_combos = list(dict.fromkeys(hero_combos + villain_combos))
+    combo_pos = {combo: i for i, combo in enumerate(all_combos)}
+
+    live = [c for c in range(52) if not board_mask >> c & 1]
+    runouts = np.array(list(combinations(live, 5 - len(board))), dtype=np.int64)
+    runouts = runouts.reshape(len(runouts), 5 - len(board))
+
+    ranks = _runout_ranks(board, runouts, all_combos, get_batch_evaluator())
+
+    hero_ranks = ranks[:, [combo_pos[c] for c in hero_combos]]
+    villain_ranks = ranks[:, [combo_pos[c] for c in villain_combos]]
+
+    # --- vertailu runoutien yli, paloissa ---
+    H, V = len(hero_combos), len(villain_combos)
+    score = np.zeros((H, V), dtype=np.float64)
+    count = np.zeros((H, V), dtype=np.int64)
+
+    step = max(1, MAX_CELLS_PER_STEP // max(1, H * V))
+    for start in range(0, len(runouts), step):
+        h = hero_ranks[start:start + step, :, None]
+        v = villain_ranks[start:start + step, None, :]
+        valid = (h >= 0) & (v >= 0)
+
+        score += ((h < v) & valid).sum(axis=0) + 0.5 * ((h == v) & valid).sum(axis=0)
+        count += valid.sum(axis=0)
+
+    # --- combo vs combo -törmäykset ---
+    hero_masks = np.array([(1 << a) | (1 << b) for a, b in hero_combos], dtype=np.uint64)
+    villain_masks = np.array([(1 << a) | (1 << b) for a, b in villain_combos], dtype=np.uint64)
+    overlap = (hero_masks[:, None] & villain_masks[None, :]) != 0
+
+    with np.errstate(invalid="ignore", divide="ignore"):
+        equity = score / count
+    equity[overlap | (count == 0)] = np.nan
+
+    return EquityMatrix(board, hero_combos, hero_weights, villain_combos, villain_weights, equity)
@@ -1,7 +1,11 @@
 ﻿# -*- coding: utf-8 -*-
 
 import random
-from engine.player_profile import PlayerProfile
+from dataclasses import astuple
+
+from engine.player_profile import CompiledProfile, PlayerProfile
+from engine.ranges import generate_combos
+from engine.utils import WeightedSampler, derive_seed
 
 # =====================================================
 # KÄSIEN VAHVUUSJÄRJESTYS (positionaalinen)
@@ -46,10 +50,12 @@ POSITIONAL_HAND_ORDER = {
 # RANGE GENERAATTORI (EI VPIP LOGIIKKAA)
 # =====================================================
 
-def generate_profile_range(profile: PlayerProfile, position: str) -> dict:
+def generate_profile_range(profile: PlayerProfile, position: str, rng=random) -> dict:
     """
     Palauttaa rangemäärityksen (painotetut kädet).
     VPIP päätetään simulatorissa, EI täällä.
+
+    rng: kohinan lähde (oletuksena globaali random).
     """
 
     ordered = POSITIONAL_HAND_ORDER.get(position, POSITIONAL_HAND_ORDER["BTN"])
@@ -61,7 +67,122 @@ def generate_profile_range(profile: PlayerProfile, position: str) -> dict:
     weights = {}
     for i, hand in enumerate(selected):
         strength_factor = 1.0 - (i / len(selected)) * 0.5
-        noise = random.uniform(0.9, 1.1)
+        noise = rng.uniform(0.9, 1.1)
         weights[hand] = round(strength_factor * noise, 3)
 
     return weights
+
+
+# =====================================================
+# KÄÄNNETTY RANGE (combot + kumulatiiviset painot)
+# =====================================================
+
+class CompiledRange:
+    """
+    Muuttumaton combotaulu yhdelle (profiili, positio) -rangelle.
+
+    Jokaisella combolla on 52-bittinen korttimaski, joten dead card
+    -suodatus on yksi AND-operaatio per combo. Arvonta tehdään kerran
+    rakennetulla WeightedSamplerilla.
+    """
+
+    __slots__ = ("combos", "masks", "weights", "sampler")
+
+    def __init__(self, range_spec: dict):
+        combos, masks, weights = [], [], []
+
+        for hand_code, weight in range_spec.items():
+            for c1, c2 in generate_combos(hand_code):
+                combos.append((c1, c2))
+                masks.append((1 << c1) | (1 << c2))
+                weights.append(weight)
+
+        self.combos = tuple(combos)
+        self.masks = tuple(masks)
+        self.weights = tuple(weights)
+        self.sampler = WeightedSampler(self.combos, self.weights, self.masks)
+
+    def __len__(self):
+        return len(self.combos)
+
+    def live(self, dead_mask: int):
+        """
+        Palauttaa (combot, painot), joista dead-kortteja sisältävät on poistettu.
+        """
+        combos, weights = [], []
+        for combo, mask, weight in zip(self.combos, self.masks, self.weights):
+            if not mask & dead_mask:
+                combos.append(combo)
+                weights.append(weight)
+        return combos, weights
+
+    def choose(self, dead_mask: int = 0, rng=random):
+        """
+        Arpoo painotetun comboa, joka ei sisällä dead-kortteja.
+        Palauttaa None jos yhtään comboa ei ole jäljellä.
+        """
+        return self.sampler.sample(rng, dead_mask)
+
+
+def compile_profile_range(profile: PlayerProfile, position: str, rng=random) -> CompiledRange:
+    return CompiledRange(generate_profile_range(profile, position, rng))
+
+
+class RangeCache:
+    """
+    Käännetyt ranget per (profiili, positio) yhden ajon ajan.
+
+    Kohina arvotaan seedistä johdetulla RNG:llä avainkohtaisesti, joten
+    sama seed antaa samat ranget kaikissa chunkeissa ja workereissa
+    hakujärjestyksestä riippumatta.
+    """
+
+    def __init__(self, seed=None):
+        self.seed = seed
+        self._ranges = {}
+
+    def get(self, profile: PlayerProfile, position: str) -> CompiledRange:
+        key = (astuple(profile), position)
+        compiled = self._ranges.get(key)
+        if compiled is None:
+            rng = random.Random(derive_seed(self.seed, position, *key[0]))
+            compiled = compile_profile_range(profile, position, rng)
+            self._ranges[key] = compiled
+        return compiled
+
+
+# Prosessikohtaiset RangeCachet seedin mukaan: saman ajon chunkit (ja
+# sweepin kaikki solut) kääntävät kunkin rangen vain kerran per prosessi.
+_SHARED_RANGE_CACHES = {}
+_SHARED_RANGE_CACHE_LIMIT = 16
+
+
+def shared_range_cache(seed) -> RangeCache:
+    """
+    Palauttaa tämän prosessin RangeCachen seedille. Käännetyt ranget ovat
+    muuttumattomia ja riippuvat vain seedistä, joten jakaminen ei muuta
+    tuloksia.
+    """
+    cache = _SHARED_RANGE_CACHES.get(seed)
+    if cache is None:
+        if len(_SHARED_RANGE_CACHES) >= _SHARED_RANGE_CACHE_LIMIT:
+            _SHARED_RANGE_CACHES.clear()
+        cache = _SHARED_RANGE_CACHES[seed] = RangeCache(seed)
+    return cache
+
+
+def compile_opponents(opponents, range_cache=None) -> list:
+    """
+    (PositionalPlayer, positio) -parit → CompiledProfile-tietueet
+    simulaation sisäsilmukkaa varten. Ilman range_cachea ranget käännetään
+    globaalin randomin kohinalla (kerran, ei käsikohtaisesti).
+    """
+    compiled = []
+    for player, position in opponents:
+        profile = player.get_profile(position)
+        if range_cache is not None:
+            profile_range = range_cache.get(profile, position)
+        else:
+            profile_range = compile_profile_range(profile, position)
+        compiled.append(CompiledProfile(profile, position, profile_range))
+    return compiled
@@ -4,12 +4,12 @@
 from dataclasses import dataclass
 from typing import Dict, List
 
-# ---- Perusvakiot ----
+from engine.cards import RANKS, SUITS, make_card
 
-RANKS = "23456789TJQKA"
-SUITS = "shdc"
+# ---- Perusvakiot ----
 
-FULL_DECK = [r + s for r in RANKS for s in SUITS]
+# Kortit kokonaislukuina 0..51 (ks. engine.cards)
+FULL_DECK = list(range(52))
 
 
 # ---- Preflop-hand ----
@@ -33,53 +33,36 @@ class PreflopHand:
 
 # ---- Kombinaatiogeneraattorit ----
 
-def generate_preflop_combos(hand: PreflopHand) -> List[List[str]]:
-    r1, r2 = hand.ranks()
-    combos = []
-
-    if hand.is_pair():
-        for i in range(len(SUITS)):
-            for j in range(i + 1, len(SUITS)):
-                combos.append([r1 + SUITS[i], r2 + SUITS[j]])
-
-    elif hand.is_suited():
-        for s in SUITS:
-            combos.append([r1 + s, r2 + s])
-
-    else:
-        for s1 in SUITS:
-            for s2 in SUITS:
-                if s1 != s2:
-                    combos.append([r1 + s1, r2 + s2])
-
-    return combos
+def generate_preflop_combos(hand: PreflopHand) -> List[List[int]]:
+    return generate_combos(hand.code)
 
 
-def generate_combos(hand_code: str) -> List[List[str]]:
+def generate_combos(hand_code: str) -> List[List[int]]:
     ranks = hand_code.replace("s", "").replace("o", "")
-    r1, r2 = ranks[0], ranks[1]
+    r1, r2 = RANKS.index(ranks[0]), RANKS.index(ranks[1])
+    n_suits = len(SUITS)
 
     combos = []
 
     if r1 == r2:
-        for i in range(len(SUITS)):
-            for j in range(i + 1, len(SUITS)):
-                combos.append([r1 + SUITS[i], r2 + SUITS[j]])
+        for i in range(n_suits):
+            for j in range(i + 1, n_suits):
+                combos.append([make_card(r1, i), make_card(r2, j)])
 
     elif hand_code.endswith("s"):
-        for s in SUITS:
-            combos.append([r1 + s, r2 + s])
+        for s in range(n_suits):
+            combos.append([make_card(r1, s), make_card(r2, s)])
 
     else:
-        for s1 in SUITS:
-            for s2 in SUITS:
+        for s1 in range(n_suits):
+            for s2 in range(n_suits):
                 if s1 != s2:
-                    combos.append([r1 + s1, r2 + s2])
+                    combos.append([make_card(r1, s1), make_card(r2, s2)])
 
     return combos
 
 
-def filter_dead_combos(combos: List[List[str]], dead_cards: set) -> List[List[str]]:
+def filter_dead_combos(combos: List[List[int]], dead_cards: set) -> List[List[int]]:
     return [
         combo for combo in combos
         if combo[0] not in dead_cards and combo[1] not in dead_cards
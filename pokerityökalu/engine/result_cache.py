@@ -0,0 +1,210 @@
+﻿# -*- coding: utf-8 -*-
+
+"""
+Levylle tallentuva tulosvälimuisti (SQLite).
+
+Avain on kanonisoidun skenaarion SHA-256 (ENGINE_VERSION mukaan lukien):
+hero ja board maa-isomorfiseen muotoon (flop joukkona, turn ja river
+omilla paikoillaan), positio, vastustajien PlayerProfile-arvot,
+vastustajamäärä, seed, moottori ja chunk-koko.
+Arvo on yhdistetty ResultAccumulator.
+
+Top-up: jos välimuistissa on 10k kättä ja pyydetään 50k, ajetaan vain
+40k uutta kättä chunk-indeksistä acc.chunks eteenpäin ja yhdistetään.
+Kun tallennettu tulos on ajettu täsmälleen samoilla korteilla (ja
+chunk_sizen monikerroilla), tulos on sama kuin yhdellä 50k ajolla. Jos
+osuma tulee maa-isomorfisesta skenaariosta, tallennetut chunkit on
+pelattu sen korteilla: tulos on sama vain jakaumaltaan, ei bitilleen.
+Toisin päin ei leikata: jos tallennettuna on 50k ja pyydetään 10k,
+palautetaan koko 50k tulos (hands = 50k).
+
+Välimuistia käytetään vain kiinteällä random_seedillä
+(simulator.open_result_cache).
+
+Koko rajataan merkintöjen määrällä ja/tai tavuilla; ylimenevät
+poistetaan vähiten äskettäin käytetystä alkaen (LRU).
+"""
+
+import hashlib
+import json
+import pickle
+import sqlite3
+import time
+from dataclasses import asdict
+from pathlib import Path
+
+from engine.isomorphism import canonicalize_streets
+from engine.models import ResultAccumulator
+
+
+# Nostetaan aina, kun simulaation päätössäännöt tai satunnaislukujen
+# käyttö muuttuu: vanhat merkinnät eivät silloin enää osu.
+ENGINE_VERSION = "3"
+
+
+def scenario_key(config, opp_count: int) -> str:
+    """
+    Vakaa avain yhdelle (config, vastustajamäärä) -parille. Kentät, jotka
+    eivät vaikuta tulokseen (evaluator-backend, välimuistit, workerit,
+    board-indeksi, iterations), eivät ole mukana.
+
+    Board avataan katujärjestyksessä (canonicalize_streets): simulaattori
+    lukee board[:3] flopiksi ja board[3] turniksi, joten samat kortit eri
+    järjestyksessä ovat eri skenaario.
+    """
+    (hero, board), _ = canonicalize_streets(config.hero_hand, config.board)
+    position = config.position or "BTN"
+
+    chunk_size = config.batch_size if config.engine == "numpy" else config.chunk_size
+
+    scenario = {
+        "engine_version": ENGINE_VERSION,
+        "hero": list(hero),
+        "board": list(board),
+        "position": position,
+        "opponents": [
+            asdict(player.get_profile(position))
+            for player in config.opponent_profiles[:opp_count]
+        ],
+        "opp_count": opp_count,
+        "seed": config.random_seed,
+        "engine": config.engine,
+        "chunk_size": chunk_size,
+    }
+
+    blob = json.dumps(scenario, sort_keys=True, separators=(",", ":"))
+    return hashlib.sha256(blob.encode("utf-8")).hexdigest()
+
+
+class ResultCache:
+
+    def __init__(self, path, max_entries=None, max_bytes=None):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+
+        # workerit voivat kirjoittaa samaan tiedostoon
+        self._db = sqlite3.connect(str(self.path), timeout=30)
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS results ("
+            " key TEXT PRIMARY KEY,"
+            " hands INTEGER NOT NULL,"
+            " payload BLOB NOT NULL,"
+            " size INTEGER NOT NULL,"
+            " created REAL NOT NULL,"
+            " last_used REAL NOT NULL)"
+        )
+        self._db.execute("CREATE INDEX IF NOT EXISTS results_lru ON results (last_used)")
+        self._db.commit()
+
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: str):
+        """Palauttaa ResultAccumulatorin tai None."""
+        row = self._db.execute(
+            "SELECT payload FROM results WHERE key = ?", (key,)
+        ).fetchone()
+
+        if row is None:
+            self.misses += 1
+            return None
+
+        self.hits += 1
+        self._db.execute(
+            "UPDATE results SET last_used = ? WHERE key = ?", (time.time(), key)
+        )
+        self._db.commit()
+        return pickle.loads(row[0])
+
+    def put(self, key: str, acc) -> None:
+        # instrumentointi ja eval-välimuistin laskurit kuvaavat yksittäistä
+        # ajoa, eivät tulosta: niitä ei tallenneta
+        stored = ResultAccumulator().merge(acc)
+        stored.instrumentation = None
+        stored.eval_cache_hits = stored.eval_cache_misses = stored.eval_cache_evictions = 0
+        payload = pickle.dumps(stored, protocol=pickle.HIGHEST_PROTOCOL)
+
+        now = time.time()
+        self._db.execute(
+            "INSERT INTO results (key, hands, payload, size, created, last_used)"
+            " VALUES (?, ?, ?, ?, ?, ?)"
+            " ON CONFLICT(key) DO UPDATE SET"
+            " hands = excluded.hands, payload = excluded.payload,"
+            " size = excluded.size, last_used = excluded.last_used",
+            (key, acc.hands, payload, len(payload), now, now),
+        )
+        self.evict()
+        self._db.commit()
+
+    def evict(self) -> int:
+        """Poistaa vanhimmat (last_used) merkinnät rajojen sisään."""
+        removed = 0
+
+        if self.max_entries is not None:
+            cur = self._db.execute(
+                "DELETE FROM results WHERE key IN ("
+                " SELECT key FROM results ORDER BY last_used DESC"
+                " LIMIT -1 OFFSET ?)",
+                (self.max_entries,),
+            )
+            removed += cur.rowcount
+
+        if self.max_bytes is not None:
+            total = self._db.execute("SELECT COALESCE(SUM(size), 0) FROM results").fetchone()[0]
+            while total > self.max_bytes:
+                row = self._db.execute(
+                    "SELECT key, size FROM results ORDER BY last_used LIMIT 1"
+                ).fetchone()
+                if row is None:
+                    break
+                self._db.execute("DELETE FROM results WHERE key = ?", (row[0],))
+                total -= row[1]
+                removed += 1
+
+        return removed
+
+    def stats(self) -> dict:
+        entries, size = self._db.execute(
+            "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM results"
+        ).fetchone()
+        return {"hits": self.hits, "misses": self.misses, "entries": entries, "bytes": size}
+
+    def clear(self) -> None:
+        self._db.execute("DELETE FROM results")
+        self._db.commit()
+
+    def close(self) -> None:
+        self._db.close()
+
+
+def cached_run_chunks(cache: ResultCache, config, opp_count, base_seed, executor=None,
+                      progress=None):
+    """
+    run_chunks välimuistin kautta: käytetään tallennettua osatulosta ja
+    ajetaan vain puuttuvat kädet (top-up), sitten tallennetaan yhdistetty.
+
+    Palautetun tuloksen käsimäärä (acc.hands, SimulationResult.hands) voi
+    olla suurempi kuin config.iterations: isompi tallennettu tulos
+    palautetaan sellaisenaan, koska kädet ovat samaa seed-sarjaa ja
+    tarkentavat estimaattia.
+    """
+    # tuodaan tässä: simulator tuo tämän moduulin
+    from engine.simulator import run_chunks
+
+    key = scenario_key(config, opp_count)
+    cached = cache.get(key)
+
+    if cached is not None and cached.hands >= config.iterations:
+        return cached
+
+    first_chunk = cached.chunks if cached is not None else 0
+    tally = run_chunks(
+        config, opp_count, base_seed, executor=executor, progress=progress,
+        initial=cached, first_chunk=first_chunk,
+    )
+
+    cache.put(key, tally)
+    return tally
@@ -1,20 +1,34 @@
-﻿import random
+﻿import math
+import random
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
 from typing import List
 
-from treys import Card as TreysCard, Evaluator
-
+from engine.cards import Deck, to_treys
 from engine.config import SimulationConfig
-from engine.models import SimulationResult
-from engine.utils import assert_unique_cards, weighted_choice
-from engine.ranges import FULL_DECK, generate_combos
-from engine.range_generator import generate_profile_range
+from engine.board_index import get_board_index
+from engine.eval_cache import cards_mask, format_cache_stats, get_eval_cache
+from engine.evaluator import evaluator_instances_created, get_evaluator
+from engine.models import ResultAccumulator, SimulationResult, mean_and_se
+from engine.result_cache import ResultCache, cached_run_chunks
+from engine.utils import DecisionStreams, ReplayStreams, assert_unique_cards, derive_seed
+from engine.range_generator import compile_opponents, shared_range_cache
 from engine.hero_decision import HeroDecisionModel
 from engine.betting_model import opponent_call_decision
+from engine.board_logic import bucket_from_value as call_bucket_from_value
 from engine.hero_strategy import HeroStrategyProfile
-DEBUG = False   # ← vaihda True kun haluat tutkia
+from engine.instrumentation import CountingEvaluator, Instrumentation, format_report
+
 
 
 
+# Blindit ja stack (bb)
+SMALL_BLIND = 0.5
+BIG_BLIND = 1.0
+STACK = 100.0
+
+# Kukaan ei maksa: hero voittaa blindit, mutta on jo maksanut BB:n
+PREFLOP_WALK = ("win_noshowdown", "preflop", SMALL_BLIND + BIG_BLIND - BIG_BLIND)
 
 HU_RIVER_PROFILE = {
     "value_bet_thin": 0.55,   # TP / weak 2p valuebet
@@ -42,20 +56,26 @@ HU_RIVER_CALL_PROBS = {
 
 
 
-def hand_strength_bucket(cards, board, evaluator):
+def hand_strength_bucket(cards, board, evaluator, cache=None):
     """
     0 = air
     1 = weak pair
     2 = top pair / overpair
     3 = two pair+
+
+    cache: valinnainen EvalCache (LRU korttimaskin mukaan)
     """
 
-    board_cards = [TreysCard.new(c) for c in board]
-    hand_cards = [TreysCard.new(c) for c in cards]
+    if cache is not None:
+        value = cache.rank(
+            cards_mask(board) | cards_mask(cards), to_treys(board), cards, evaluator,
+        )
+    else:
+        value = evaluator.evaluate(to_treys(board), to_treys(cards))
+    return strength_bucket_from_value(value)
 
-    value = evaluator.evaluate(board_cards, hand_cards)
 
-    
+def strength_bucket_from_value(value: int) -> int:
     if value <= 1600:
         bucket = 3
     elif value <= 3000:
@@ -65,9 +85,51 @@ def hand_strength_bucket(cards, board, evaluator):
     else:
         bucket = 0
 
-   
     return bucket
 
+
+class StreetContext:
+    """
+    Yhden streetin evaluoinnit yhden käden sisällä.
+
+    Jokainen elävä käsi evaluoidaan kerran per street; rank ja molemmat
+    bucketit (simulatorin ja betting modelin rajat) luetaan välimuistista.
+    Jos eval_cache on annettu, rank haetaan ensin käsien yli jaetusta
+    LRU-välimuistista.
+    """
+
+    __slots__ = ("board", "evaluator", "board_cards", "board_mask", "eval_cache", "_values")
+
+    def __init__(self, board, evaluator, eval_cache=None):
+        self.board = board
+        self.evaluator = evaluator
+        self.board_cards = to_treys(board)
+        self.board_mask = cards_mask(board)
+        self.eval_cache = eval_cache
+        self._values = {}
+
+    def value(self, hand) -> int:
+        key = hand[0] * 52 + hand[1]
+        value = self._values.get(key)
+        if value is None:
+            if self.eval_cache is not None:
+                value = self.eval_cache.rank(
+                    self.board_mask | (1 << hand[0]) | (1 << hand[1]),
+                    self.board_cards, hand, self.evaluator,
+                )
+            else:
+                value = self.evaluator.evaluate(self.board_cards, to_treys(hand))
+            self._values[key] = value
+        return value
+
+    def bucket(self, hand) -> int:
+        """simulator.hand_strength_bucket"""
+        return strength_bucket_from_value(self.value(hand))
+
+    def call_bucket(self, hand) -> int:
+        """board_logic.hand_strength_bucket (betting model)"""
+        return call_bucket_from_value(self.value(hand))
+
 def street_bet_size(
     street: str,
     pot_size: float,
@@ -114,16 +176,15 @@ def board_texture(board):
     if len(board) < 3:
         return "dry"
 
-    ranks = [c[0] for c in board]
-    suits = [c[1] for c in board]
+    # korttiluvut: rank = c >> 2, suit = c & 3
+    ranks = [c >> 2 for c in board]
+    suits = [c & 3 for c in board]
 
     # samaa maata
     max_suit = max(suits.count(s) for s in set(suits))
 
     # peräkkäisiä rankeja
-    rank_order = "23456789TJQKA"
-    idx = sorted(rank_order.index(r) for r in ranks)
-    gaps = max(idx) - min(idx)
+    gaps = max(ranks) - min(ranks)
 
     if max_suit >= 3 or gaps <= 4:
         return "wet"
@@ -144,15 +205,14 @@ def detect_draws(board):
     if len(board) < 3:
         return {"flush_draw": False, "straight_draw": False}
 
-    ranks = [c[0] for c in board]
-    suits = [c[1] for c in board]
+    ranks = [c >> 2 for c in board]
+    suits = [c & 3 for c in board]
 
     # --- Flush draw ---
     flush_draw = any(suits.count(s) >= 2 for s in set(suits))
 
     # --- Straight draw ---
-    rank_order = "23456789TJQKA"
-    idx = sorted(set(rank_order.index(r) for r in ranks))
+    idx = sorted(set(ranks))
     straight_draw = False
     for i in range(len(idx) - 1):
         if idx[i + 1] - idx[i] <= 2:
@@ -165,6 +225,7 @@ def detect_draws(board):
     }
 
 # NOTE: apply_folds is currently unused (kept for future alternative sim mode)
+# active-listan profiilit ovat CompiledProfile-tietueita (fold_* valmiiksi 0..1)
 
 def apply_folds(
     active,
@@ -174,15 +235,20 @@ def apply_folds(
     pressure,
     street,
     post_d1=False,   # 🔥 UUSI
+    board_index=None,
 ):
     remaining = []
 
-    texture = board_texture(board)
-    draws = detect_draws(board)
+    if board_index is not None:
+        texture = board_index.texture(board)
+        draws = board_index.draws(board)
+    else:
+        texture = board_texture(board)
+        draws = detect_draws(board)
 
     for hand, profile, committed in active:
         strength = hand_strength_bucket(hand, board, evaluator)
-        base_fold = getattr(profile, profile_attr, 50) / 100.0
+        base_fold = getattr(profile, profile_attr, 0.5)
 
         # --- perus fold ---
         if strength == 0:
@@ -240,6 +306,11 @@ This may result in 0% showdown equity with very high non-showdown win rate.
 This is expected behavior, not a bug.
 """
 
+def _global_stream(point):
+    """Oletuslähde: kaikki päätöskohdat jakavat globaalin randomin."""
+    return random
+
+
 def simulate_postflop_once(
     hero_hand,
     fixed_board,
@@ -247,81 +318,128 @@ def simulate_postflop_once(
     evaluator,
     hero_strategy=None,
     vpip_tracker=None,
+    eval_cache=None,
+    board_index=None,
+    rng=None,
+    instrumentation=None,
+    deck=None,
 ):
+    """
+    Yksi käsi. opponents: CompiledProfile-tietueet (compile_opponents).
+    deck: uudelleenkäytettävä Deck (chunkin sisällä yksi), muuten uusi.
+    Palauttaa (result, street, net_bb).
+    """
     if hero_strategy is None:
         hero_strategy = HeroStrategyProfile()
 
-    deck = FULL_DECK.copy()
-    # --- Blindit ---
-    SB = 0.5
-    BB = 1.0
+    # tekstuuri valmiista indeksistä, jos sellainen on annettu
+    texture_of = board_index.texture if board_index is not None else board_texture
 
-    hero_invested = BB
-    pot_size = SB + BB
-    STACK = 100.0
-    hero_stack = STACK - hero_invested
-
-
-    for c in hero_hand:
-        deck.remove(c)
+    # satunnaislähde per päätöskohta (DecisionStreams), oletuksena globaali random
+    draw = rng if rng is not None else _global_stream
 
-    board = fixed_board.copy()
-    for c in board:
+    if deck is None:
+        deck = Deck()
+    deck.reset(hero_hand)
+    for c in fixed_board:
         deck.remove(c)
 
-    dead_cards = set(hero_hand + board)
-    active = []
-
     # ==================================================
     # PRE-FLOP
     # ==================================================
-    for player, position in opponents:
-        profile = player.get_profile(position)
+    played, dealt = deal_opponents(deck, opponents, draw, instrumentation)
 
-        if vpip_tracker is not None:
-            vpip_tracker["total"] += 1
+    if vpip_tracker is not None:
+        vpip_tracker["total"] += len(opponents)
+        vpip_tracker["played"] += sum(played)
 
-        if random.random() > (profile.vpip / 100.0):
-            continue
+    active = [entry for entry in dealt if entry is not None]
 
-        if vpip_tracker is not None:
-            vpip_tracker["played"] += 1
+    # 🔴 PRE-FLOP LOPPUTARKISTUS
+    if not active:
+        # Hero voittaa blindit, mutta on jo maksanut BB:n
+        return PREFLOP_WALK
+
+    # vain puuttuvat boardikortit arvotaan
+    board = fixed_board + deck.draw(5 - len(fixed_board), draw("deck"))
+
+    return play_postflop(
+        hero_hand, board, active, evaluator, hero_strategy, draw,
+        eval_cache=eval_cache, texture_of=texture_of, instrumentation=instrumentation,
+    )
 
-        range_spec = generate_profile_range(profile, position)
-        combos, weights = [], []
 
-        for hand_code, weight in range_spec.items():
-            for c1, c2 in generate_combos(hand_code):
-                if c1 in dead_cards or c2 in dead_cards:
-                    continue
-                combos.append((c1, c2))
-                weights.append(weight)
+def deal_opponents(deck, opponents, draw, instrumentation=None):
+    """
+    Preflop istumajärjestyksessä: VPIP-päätös ja rangearvonta jokaiselle
+    vastustajalle (CompiledProfile). Rangesta suodatetaan pakan
+    dead_maskilla, ja jaetut kortit poistetaan pakasta.
 
-        if not combos:
+    Palauttaa (played, dealt): played[i] = pelasiko vastustaja i (VPIP),
+    dealt[i] = (hand, profile, committed) tai None.
+    """
+    played = []
+    dealt = []
+
+    for profile in opponents:
+        if draw("vpip").random() > profile.vpip:
+            played.append(False)
+            dealt.append(None)
             continue
 
-        hand = weighted_choice(combos, weights)
+        played.append(True)
+        compiled = profile.range
+        dead_mask = deck.dead_mask
+
+        if instrumentation is not None:
+            instrumentation.range_draw(compiled, dead_mask)
+
+        hand = compiled.choose(dead_mask, draw("range"))
+        if hand is None:
+            if instrumentation is not None:
+                instrumentation.range_empty += 1
+            dealt.append(None)
+            continue
 
         # 🔒 turvallinen deck-poisto
-        if hand[0] not in deck or hand[1] not in deck:
+        if ((1 << hand[0]) | (1 << hand[1])) & dead_mask:
+            if instrumentation is not None:
+                instrumentation.safe_removal_skips += 1
+            dealt.append(None)
             continue
 
         deck.remove(hand[0])
         deck.remove(hand[1])
-        dead_cards.update(hand)
-        active.append((hand, profile, False))
+        dealt.append((hand, profile, False))
 
-    # 🔴 PRE-FLOP LOPPUTARKISTUS
-    if not active:
-        # Hero voittaa blindit, mutta on jo maksanut BB:n
-        return "win_noshowdown", "preflop", pot_size - hero_invested
+    return played, dealt
 
-    # 🔑 Määrittele HU/MW tila kerran ja päivitä aina streetien välissä
-    # 🔒 Lukitaan HU-status koko kädelle
-    is_heads_up_hand = (len(opponents) == 1)
+
+def street_context(contexts, street, board, evaluator, eval_cache=None) -> StreetContext:
+    """
+    StreetContext streetille; contexts-sanakirjalla sama konteksti jaetaan
+    saman boardin ratkaisujen kesken (nested-moottori).
+    """
+    if contexts is None:
+        return StreetContext(board, evaluator, eval_cache)
+
+    ctx = contexts.get(street)
+    if ctx is None:
+        ctx = contexts[street] = StreetContext(board, evaluator, eval_cache)
+    return ctx
 
 
-    random.shuffle(deck)
+def play_postflop(hero_hand, full_board, active, evaluator, hero_strategy, draw,
+                  eval_cache=None, texture_of=board_texture, instrumentation=None,
+                  contexts=None):
+    """
+    Flopista showdowniin. full_board on koko viiden kortin board (kiinteät
+    kortit + jaettu runout); streetit näkevät siitä 3, 4 ja 5 korttia.
+    Palauttaa (result, street, net_bb).
+    """
+    hero_invested = BIG_BLIND
+    pot_size = SMALL_BLIND + BIG_BLIND
+    hero_stack = STACK - hero_invested
 
     hero_model = HeroDecisionModel()   # ✅ AINA määritelty
     pressure = 0
@@ -329,13 +447,15 @@ def simulate_postflop_once(
     # ==================================================
     # FLOP
     # ==================================================
+    if instrumentation is not None:
+        instrumentation.mark("flop")
+
     is_heads_up_hand = (len(active) == 1)
 
-    
-    while len(board) < 3:
-        board.append(deck.pop())
 
-    texture = board_texture(board)
+    board = full_board[:3]
+
+    texture = texture_of(board)
     pressure = 1
 
     bet = street_bet_size(
@@ -346,9 +466,10 @@ def simulate_postflop_once(
     )
     bet = min(bet, hero_stack)
 
-    hero_strength = hand_strength_bucket(hero_hand, board, evaluator)
+    street_ctx = street_context(contexts, "flop", board, evaluator, eval_cache)
+    hero_strength = street_ctx.bucket(hero_hand)
 
-    opp_fold = sum(p.fold_flop for _, p, _ in active) / max(1, 100 * len(active))
+    opp_fold = sum(p.fold_flop for _, p, _ in active) / len(active)
     opp_fold = max(0.25, min(opp_fold, 0.55))
 
     if hero_strength == 0:
@@ -357,7 +478,7 @@ def simulate_postflop_once(
             base_continue = 0.80   # 🔥 HU: floatataan
 
         if not (
-            random.random() < base_continue
+            draw("flop_hero").random() < base_continue
             or hero_model.should_continue("flop", pressure, opp_fold, texture)
         ):
             return "loss_noshowdown", "flop", -hero_invested
@@ -370,7 +491,9 @@ def simulate_postflop_once(
     for hand, profile, committed in active:
         calls, _ = opponent_call_decision(
             hand, board, "flop", pot_size, bet, texture, pressure,
-            aggression=profile.aggression / 100.0,
+            aggression=profile.aggression,
+            strength=street_ctx.call_bucket(hand),
+            rng=draw("flop_calls"),
         )
         if calls:
             callers.append((hand, profile, committed))
@@ -385,10 +508,12 @@ def simulate_postflop_once(
     # ==================================================
     # TURN
     # ==================================================
-    while len(board) < 4:
-        board.append(deck.pop())
+    if instrumentation is not None:
+        instrumentation.mark("turn")
 
-    texture = board_texture(board)
+    board = full_board[:4]
+
+    texture = texture_of(board)
     pressure += 1
 
     bet = street_bet_size(
@@ -399,9 +524,10 @@ def simulate_postflop_once(
     )
     bet = min(bet, hero_stack)
 
-    hero_strength = hand_strength_bucket(hero_hand, board, evaluator)
+    street_ctx = street_context(contexts, "turn", board, evaluator, eval_cache)
+    hero_strength = street_ctx.bucket(hero_hand)
 
-    opp_fold = sum(p.fold_turn for _, p, _ in active) / max(1, 100 * len(active))
+    opp_fold = sum(p.fold_turn for _, p, _ in active) / len(active)
 
     if hero_strength == 0:
         base_continue = 0.45
@@ -409,7 +535,7 @@ def simulate_postflop_once(
             base_continue = 0.70   # 🔥 HU: bluffcatch
 
         if not (
-            random.random() < base_continue
+            draw("turn_hero").random() < base_continue
             or hero_model.should_continue("turn", pressure, opp_fold, texture)
         ):
             return "loss_noshowdown", "turn", -hero_invested
@@ -422,7 +548,9 @@ def simulate_postflop_once(
     for hand, profile, committed in active:
         calls, _ = opponent_call_decision(
             hand, board, "turn", pot_size, bet, texture, pressure,
-            aggression=profile.aggression / 100.0,
+            aggression=profile.aggression,
+            strength=street_ctx.call_bucket(hand),
+            rng=draw("turn_calls"),
         )
         if calls:
             callers.append((hand, profile, committed))
@@ -438,12 +566,14 @@ def simulate_postflop_once(
     # ==================================================
     # RIVER
     # ==================================================
+    if instrumentation is not None:
+        instrumentation.mark("river")
 
     # 🔹 Täydennä board ensin
-    while len(board) < 5:
-        board.append(deck.pop())
+    board = full_board
 
-    hero_strength = hand_strength_bucket(hero_hand, board, evaluator)
+    street_ctx = street_context(contexts, "river", board, evaluator, eval_cache)
+    hero_strength = street_ctx.bucket(hero_hand)
     is_heads_up_hand = (len(active) == 1)
 
     # ================================
@@ -463,7 +593,7 @@ def simulate_postflop_once(
 
         sd_prob = min(0.85, base_sd_prob + 0.4 * pot_pressure)
 
-        if random.random() < sd_prob:
+        if draw("river_showdown").random() < sd_prob:
             force_showdown = True
 
     river_profile = HU_RIVER_PROFILE if is_heads_up_hand else MW_RIVER_PROFILE
@@ -471,7 +601,7 @@ def simulate_postflop_once(
     bet = street_bet_size(
         "river",
         pot_size,
-        board_texture(board),
+        texture_of(board),
         aggression=hero_strategy.aggression,
     )
     bet = min(bet, hero_stack)
@@ -482,16 +612,16 @@ def simulate_postflop_once(
     river_betters = []
 
     for hand, profile, committed in active:
-        opp_strength = hand_strength_bucket(hand, board, evaluator)
+        opp_strength = street_ctx.bucket(hand)
 
         if is_heads_up_hand:
             value_prob = 0.65 if opp_strength >= 2 else 0.20
-            bluff_prob = 0.35 * (0.5 + profile.aggression / 100.0)
+            bluff_prob = 0.35 * (0.5 + profile.aggression)
         else:
             value_prob = 0.70 if opp_strength >= 2 else 0.0
-            bluff_prob = river_profile["bluff_freq"] * (0.5 + profile.aggression / 100.0)
+            bluff_prob = river_profile["bluff_freq"] * (0.5 + profile.aggression)
 
-        if random.random() < (value_prob + bluff_prob):
+        if draw("river_bets").random() < (value_prob + bluff_prob):
             river_betters.append((hand, profile, committed))
 
     # --------------------------------------------------
@@ -515,7 +645,7 @@ def simulate_postflop_once(
             bluff_pressure = min(
                 0.25,
                 river_profile["bluff_freq"]
-                * (0.5 + river_betters[0][1].aggression / 100.0)
+                * (0.5 + river_betters[0][1].aggression)
             )
 
             effective_equity = min(0.95, est_equity + bluff_pressure)
@@ -524,7 +654,7 @@ def simulate_postflop_once(
             if hero_strength >= 2:
                 hero_calls = True
             elif hero_strength == 1:
-                hero_calls = random.random() < (
+                hero_calls = draw("river_hero").random() < (
                     river_profile["call_down"] * hero_strategy.call_down
                 )
             else:
@@ -548,10 +678,10 @@ def simulate_postflop_once(
             hero_bets = True
             call_prob = 0.75
         elif hero_strength == 2:
-            hero_bets = random.random() < river_profile["value_bet_thin"]
+            hero_bets = draw("river_hero").random() < river_profile["value_bet_thin"]
             call_prob = 0.55
         elif hero_strength == 1:
-            hero_bets = random.random() < (
+            hero_bets = draw("river_hero").random() < (
                 river_profile["bluff_freq"] * hero_strategy.bluff_freq
             )
             call_prob = 0.35
@@ -563,8 +693,8 @@ def simulate_postflop_once(
     
             callers = []
             for hand, profile, committed in active:
-                opp_strength = hand_strength_bucket(hand, board, evaluator)
-                if opp_strength >= hero_strength and random.random() < call_prob:
+                opp_strength = street_ctx.bucket(hand)
+                if opp_strength >= hero_strength and draw("river_calls").random() < call_prob:
                     callers.append((hand, profile, committed))
                     pot_size += bet
     
@@ -602,16 +732,14 @@ def simulate_postflop_once(
 
     assert_unique_cards(hero_hand, board, *[h for h, _, _ in active])
 
-    board_cards = [TreysCard.new(c) for c in board]
-    hero_cards = [TreysCard.new(c) for c in hero_hand]
-    hero_value = evaluator.evaluate(board_cards, hero_cards)
+    # river-kontekstissa kaikki elävät kädet on jo evaluoitu
+    hero_value = street_ctx.value(hero_hand)
 
     hero_best = hero_value
     tie = False
 
     for hand, _, _ in active:
-        opp_cards = [TreysCard.new(c) for c in hand]
-        opp_value = evaluator.evaluate(board_cards, opp_cards)
+        opp_value = street_ctx.value(hand)
 
         if opp_value < hero_best:
             return "loss", None, -hero_invested
@@ -624,130 +752,550 @@ def simulate_postflop_once(
         return "win", None, pot_size - hero_invested
 
 
+
+def simulate_nested_once(
+    hero_hand,
+    fixed_board,
+    opponents,
+    evaluator,
+    rng,
+    hero_strategy=None,
+    vpip_trackers=None,
+    eval_cache=None,
+    board_index=None,
+    deck=None,
+):
+    """
+    Nested-jako: hero ja kaikki vastustajat jaetaan kerran, ja käsi
+    ratkaistaan jokaiselle etuliitteelle opponents[:k] samoilla korteilla.
+    Palauttaa listan (result, street, net_bb), k = 1..len(opponents).
+
+    Vastustajan i VPIP-päätös ja käsi riippuvat vain istujista 0..i, joten
+    etuliitteen vastustajat jaetaan kuten pelkillä k vastustajalla. Boardin
+    runout ei saa riippua istujista k+1.., joten se pidetään per k:
+    runout_k on tasajakautunut pakasta, josta on poistettu vain istujien
+    1..k kortit. Edellisen k:n runout kelpaa sellaisenaan, jos istujan k
+    kortit eivät osu siihen (ehdollistettuna se on yhä tasajakautunut),
+    muuten arvotaan uusi. Näin jokainen k on jakaumaltaan täsmälleen sama
+    kuin erillinen ajo, ja useimmat k:t jakavat saman boardin.
+
+    Flopin jälkeiset päätökset toistetaan ReplayStreamsilla samoina
+    jokaiselle k:lle, ja streetien rank-arvot (StreetContext) jaetaan
+    saman boardin ratkaisujen kesken.
+
+    vpip_trackers: valinnainen lista trackereita, yksi per k.
+    """
+    if hero_strategy is None:
+        hero_strategy = HeroStrategyProfile()
+
+    texture_of = board_index.texture if board_index is not None else board_texture
+
+    def deal(point):
+        return rng
+
+    if deck is None:
+        deck = Deck()
+    deck.reset(hero_hand)
+    for c in fixed_board:
+        deck.remove(c)
+
+    played, dealt = deal_opponents(deck, opponents, deal)
+
+    streams = ReplayStreams(rng)
+    contexts = {}
+    outcomes = []
+    active = []
+    played_count = 0
+
+    # runoutin dead-kortit: hero, kiinteä board ja istujat 1..k
+    dead = list(hero_hand) + list(fixed_board)
+    board = None
+
+    for k, entry in enumerate(dealt, start=1):
+        played_count += played[k - 1]
+        if vpip_trackers is not None:
+            vpip_trackers[k - 1]["total"] += k
+            vpip_trackers[k - 1]["played"] += played_count
+
+        if entry is not None:
+            active.append(entry)
+            hand = entry[0]
+            dead.extend(hand)
+            if board is not None and (hand[0] in board or hand[1] in board):
+                board = None
+
+        if not active:
+            outcomes.append(PREFLOP_WALK)
+            continue
+
+        if board is None:
+            board = fixed_board + deck.reset(dead).draw(5 - len(fixed_board), rng)
+            contexts = {}
+
+        streams.rewind()
+        outcomes.append(play_postflop(
+            hero_hand, board, active.copy(), evaluator,
+            hero_strategy, streams, eval_cache=eval_cache, texture_of=texture_of,
+            contexts=contexts,
+        ))
+
+    return outcomes
+
+
    
-def run_simulation(config: SimulationConfig) -> List[SimulationResult]:
+def chunk_sizes(config: SimulationConfig, iterations=None) -> List[int]:
+    """
+    Jakaa config.iterations (tai iterations) kiinteän kokoisiin chunkeihin.
+    Jako ei riipu workerien määrästä, joten sama seed antaa saman tuloksen aina.
+    """
+    size = config.batch_size if config.engine == "numpy" else config.chunk_size
+    size = max(1, size)
 
-    if config.random_seed is not None:
-        random.seed(config.random_seed)
+    if iterations is None:
+        iterations = config.iterations
+    full, rest = divmod(max(0, iterations), size)
+    return [size] * full + ([rest] if rest else [])
 
-    assert_unique_cards(config.hero_hand, config.board)
 
-    evaluator = Evaluator()
-    results = []
+def run_chunk(config, opp_count, chunk_index, hands, base_seed, hero_strategy=None):
+    """
+    Ajaa yhden chunkin omalla seedillään ja palauttaa osatuloksen (tally).
+    Kutsutaan sekä pääprosessissa että process poolin workereissa.
+    """
+    seed = derive_seed(base_seed, opp_count, chunk_index)
+    random.seed(seed)
 
     hero_position = config.position or "BTN"
-    max_opps = min(6, len(config.opponent_profiles))
+    opponents = [
+        (player, hero_position)
+        for player in config.opponent_profiles[:opp_count]
+    ]
+
+    # rangejen kohina on ajokohtainen (ei chunkkikohtainen)
+    range_cache = shared_range_cache(derive_seed(base_seed, "ranges"))
+
+    if config.engine == "numpy":
+        from engine.batch_simulator import simulate_chunk_batch
+        return simulate_chunk_batch(
+            config, opponents, hands, seed, hero_strategy, range_cache,
+        )
 
-    for opp_count in range(1, max_opps + 1):
+    # profiilit ja ranget valmiiksi sisäsilmukkaa varten
+    opponents = compile_opponents(opponents, range_cache)
+
+    evaluator = get_evaluator(config.evaluator_backend)
+    eval_cache = get_eval_cache(config.eval_cache_size)
+    board_index = get_board_index() if config.use_board_index else None
+    cache_before = eval_cache.stats() if eval_cache is not None else None
+
+    tally = ResultAccumulator()
+    tally.chunks = 1
+    vpip_tracker = {"total": 0, "played": 0}
+
+    instrumentation = Instrumentation() if config.instrument else None
+    if instrumentation is not None:
+        evaluator = CountingEvaluator(evaluator, instrumentation)
+
+    deck = Deck()
+
+    for _ in range(hands):
+        if instrumentation is not None:
+            instrumentation.start_hand()
+
+        result, street, net_bb = simulate_postflop_once(
+            hero_hand=config.hero_hand,
+            fixed_board=config.board,
+            opponents=opponents,
+            evaluator=evaluator,
+            hero_strategy=hero_strategy,
+            vpip_tracker=vpip_tracker,
+            eval_cache=eval_cache,
+            board_index=board_index,
+            instrumentation=instrumentation,
+            deck=deck,
+        )
+        tally.add(result, street, net_bb)
 
-        # =========================
-        # INIT
-        # =========================
-        wins = losses = ties = 0
-        non_sd_wins = 0
-        showdown_wins = showdown_losses = showdown_hands = 0
+        if instrumentation is not None:
+            instrumentation.end_hand(street)
 
-        total_net_bb = 0.0
-        showdown_net_bb = 0.0
-        non_sd_net_bb = 0.0
+    tally.vpip_total = vpip_tracker["total"]
+    tally.vpip_played = vpip_tracker["played"]
 
-        sd_count = 0
-        nsd_count = 0
+    if eval_cache is not None:
+        cache_after = eval_cache.stats()
+        for name in ("hits", "misses", "evictions"):
+            setattr(tally, f"eval_cache_{name}", cache_after[name] - cache_before[name])
 
-        hands_played = 0
+    if instrumentation is not None:
+        # ilman välimuistia jokainen haku on evaluaattorikutsu
+        instrumentation.eval_lookups = (
+            tally.eval_cache_hits + tally.eval_cache_misses
+            if eval_cache is not None else instrumentation.evaluator_calls
+        )
 
-        vpip_tracker = {"total": 0, "played": 0}
+    tally.instrumentation = instrumentation
+    return tally
 
-        opponents = [
-            (player, hero_position)
-            for player in config.opponent_profiles[:opp_count]
-        ]
 
-        # =========================
-        # SIM LOOP
-        # =========================
-        for _ in range(config.iterations):
-            hands_played += 1
+def _run_chunk_task(args):
+    return run_chunk(*args)
 
-            result, street, net_bb = simulate_postflop_once(
-                hero_hand=config.hero_hand,
-                fixed_board=config.board,
-                opponents=opponents,
-                evaluator=evaluator,
-                vpip_tracker=vpip_tracker,
-            )
 
-            total_net_bb += net_bb
+def run_nested_chunk(config, max_opps, chunk_index, hands, base_seed, hero_strategy=None):
+    """
+    Nested-chunkki: jokainen käsi jaetaan kerran ja ratkaistaan kaikille
+    vastustajamäärille 1..max_opps. Palauttaa listan osatuloksia (yksi per
+    vastustajamäärä). Vain python-moottori; instrumentointia ei kerätä.
+    """
+    rng = random.Random(derive_seed(base_seed, "nested", chunk_index))
 
-            # ===== SD vs NSD EV DEBUG =====
-            if result in ("win", "loss", "tie"):
-                showdown_net_bb += net_bb
-                sd_count += 1
-            else:
-                non_sd_net_bb += net_bb
-                nsd_count += 1
-
-            # ===== W/L tracking =====
-            if result in ("win", "loss", "tie"):
-                showdown_hands += 1
-
-                if result == "win":
-                    showdown_wins += 1
-                    wins += 1
-                elif result == "loss":
-                    showdown_losses += 1
-                    losses += 1
-                else:  # tie
-                    ties += 1
-            else:
-                if result == "win_noshowdown":
-                    wins += 1
-                    non_sd_wins += 1
-                elif result == "loss_noshowdown":
-                    losses += 1
-
-        # =========================
-        # METRICS
-        # =========================
-        total_hands = hands_played
-
-        showdown_total = showdown_wins + showdown_losses
-        showdown_equity = (
-            showdown_wins / showdown_total * 100
-            if showdown_total else 0.0
+    hero_position = config.position or "BTN"
+    range_cache = shared_range_cache(derive_seed(base_seed, "ranges"))
+    opponents = compile_opponents(
+        [(player, hero_position) for player in config.opponent_profiles[:max_opps]],
+        range_cache,
+    )
+    evaluator = get_evaluator(config.evaluator_backend)
+    eval_cache = get_eval_cache(config.eval_cache_size)
+    board_index = get_board_index() if config.use_board_index else None
+    cache_before = eval_cache.stats() if eval_cache is not None else None
+
+    tallies = [ResultAccumulator() for _ in range(max_opps)]
+    trackers = [{"total": 0, "played": 0} for _ in range(max_opps)]
+    deck = Deck()
+
+    for _ in range(hands):
+        outcomes = simulate_nested_once(
+            hero_hand=config.hero_hand,
+            fixed_board=config.board,
+            opponents=opponents,
+            evaluator=evaluator,
+            rng=rng,
+            hero_strategy=hero_strategy,
+            vpip_trackers=trackers,
+            eval_cache=eval_cache,
+            board_index=board_index,
+            deck=deck,
         )
+        for tally, (result, street, net_bb) in zip(tallies, outcomes):
+            tally.add(result, street, net_bb)
+
+    for tally, tracker in zip(tallies, trackers):
+        tally.chunks = 1
+        tally.vpip_total = tracker["total"]
+        tally.vpip_played = tracker["played"]
+
+    # eval-välimuisti on yhteinen kaikille vastustajamäärille: kirjataan kerran
+    if eval_cache is not None:
+        cache_after = eval_cache.stats()
+        for name in ("hits", "misses", "evictions"):
+            setattr(tallies[0], f"eval_cache_{name}", cache_after[name] - cache_before[name])
+
+    return tallies
+
+
+def _run_nested_chunk_task(args):
+    return run_nested_chunk(*args)
+
+
+def iter_chunk_tallies(config, opp_count, base_seed, hero_strategy=None, executor=None,
+                       first_chunk=0, iterations=None, task=_run_chunk_task):
+    """
+    Tuottaa chunkkien osatulokset chunkkijärjestyksessä. Executorilla
+    ajossa on korkeintaan 2 * workers chunkkia kerrallaan, joten
+    aikainen pysäytys ei laske turhia chunkkeja.
+
+    first_chunk / iterations: jatkoajo (top-up) chunkista first_chunk
+    eteenpäin iterations kädelle; chunkkien seedit jatkuvat samasta kohdasta.
+    task: chunkin ajava funktio (oletus run_chunk, nested: run_nested_chunk).
+    """
+    tasks = (
+        (config, opp_count, first_chunk + i, hands, base_seed, hero_strategy)
+        for i, hands in enumerate(chunk_sizes(config, iterations))
+    )
+
+    if executor is None:
+        for args in tasks:
+            yield task(args)
+        return
+
+    pending = deque()
+    try:
+        for args in tasks:
+            pending.append(executor.submit(task, args))
+            if len(pending) >= 2 * config.workers:
+                yield pending.popleft().result()
+
+        while pending:
+            yield pending.popleft().result()
+    finally:
+        for future in pending:
+            future.cancel()
 
-        non_sd_pct = (
-            non_sd_wins / total_hands * 100
-            if total_hands else 0.0
-        )
 
-        ev_per_hand = total_net_bb / total_hands
-        bb_per_100 = ev_per_hand * 100
+def ci_target_reached(config: SimulationConfig, progress: dict) -> bool:
+    if not config.target_ci_width:
+        return False
+    if progress["hands"] < config.min_iterations:
+        return False
+    return progress["ci_width"] <= config.target_ci_width
 
-        mode = "HU" if opp_count == 1 else "MW"
 
-        # =========================
-        # DEBUG OUTPUT (KOHTA 4)
-        # =========================
+def iter_progress(config, opp_count, base_seed, hero_strategy=None, executor=None,
+                  initial=None, first_chunk=0):
+    """
+    Yhdistää chunkit yksi kerrallaan ja tuottaa (tally, progress) jokaisen
+    chunkin jälkeen. Pysähtyy, kun luottamusvälin tavoite täyttyy.
+    Pysäytyspäätös tehdään chunkkijärjestyksessä, joten tulos ei riipu
+    workerien määrästä.
+
+    initial: aiempi osatulos (esim. välimuistista), jota jatketaan
+    chunkista first_chunk, kunnes yhteensä config.iterations kättä.
+    """
+    tally = ResultAccumulator()
+    if initial is not None:
+        tally.merge(initial)
+
+    remaining = config.iterations - tally.hands
+    parts = iter_chunk_tallies(
+        config, opp_count, base_seed, hero_strategy, executor,
+        first_chunk=first_chunk, iterations=remaining,
+    )
+
+    for part in parts:
+        tally.merge(part)
+
+        progress = tally.progress(opp_count)
+        stop = ci_target_reached(config, progress)
+        progress["done"] = stop or tally.hands >= config.iterations
+
+        yield tally, progress
+
+        if stop:
+            break
+
+
+def run_chunks(config, opp_count, base_seed, hero_strategy=None, executor=None,
+               progress=None, initial=None, first_chunk=0) -> ResultAccumulator:
+    """
+    Ajaa opp_countin chunkit (rinnakkain jos executor annettu) ja palauttaa
+    yhdistetyn osatuloksen. progress(dict) kutsutaan jokaisen chunkin jälkeen.
+    """
+    tally = initial if initial is not None else ResultAccumulator()
+    for tally, snapshot in iter_progress(
+        config, opp_count, base_seed, hero_strategy, executor,
+        initial=initial, first_chunk=first_chunk,
+    ):
+        if progress is not None:
+            progress(snapshot)
+    return tally
+
+
+def iter_nested_progress(config, max_opps, base_seed, hero_strategy=None, executor=None):
+    """
+    Nested-ajo: yhdet kädet kaikille vastustajamäärille 1..max_opps.
+    Tuottaa (tallies, snapshots) jokaisen chunkin jälkeen, molemmat
+    vastustajamäärän mukaan järjestettynä. CI-tavoitteella pysähdytään,
+    kun jokainen vastustajamäärä on saavuttanut sen.
+    """
+    tallies = [ResultAccumulator() for _ in range(max_opps)]
+
+    parts_iter = iter_chunk_tallies(
+        config, max_opps, base_seed, hero_strategy, executor,
+        task=_run_nested_chunk_task,
+    )
+    for parts in parts_iter:
+        for tally, part in zip(tallies, parts):
+            tally.merge(part)
+
+        snapshots = [tally.progress(k) for k, tally in enumerate(tallies, start=1)]
+        stop = all(ci_target_reached(config, snapshot) for snapshot in snapshots)
+
+        for snapshot in snapshots:
+            snapshot["done"] = stop or snapshot["hands"] >= config.iterations
+
+        yield tallies, snapshots
+
+        if stop:
+            break
+
+
+def run_nested_chunks(config, max_opps, base_seed, hero_strategy=None, executor=None,
+                      progress=None) -> List[ResultAccumulator]:
+    """
+    iter_nested_progress loppuun; palauttaa osatulokset vastustajamäärän
+    mukaan. progress(dict) kutsutaan jokaiselle vastustajamäärälle
+    jokaisen chunkin jälkeen.
+    """
+    tallies = [ResultAccumulator() for _ in range(max_opps)]
+    for tallies, snapshots in iter_nested_progress(
+        config, max_opps, base_seed, hero_strategy, executor,
+    ):
+        if progress is not None:
+            for snapshot in snapshots:
+                progress(snapshot)
+    return tallies
+
+
+def open_result_cache(config: SimulationConfig):
+    """
+    ResultCache, jos config.result_cache_path on annettu, muuten None.
+    Ilman random_seediä välimuistia ei käytetä: tallennetuilla chunkeilla
+    ei olisi toistettavaa seed-sarjaa, jota top-up voisi jatkaa.
+    """
+    if not config.result_cache_path or config.random_seed is None:
+        return None
+
+    max_bytes = None
+    if config.result_cache_max_mb is not None:
+        max_bytes = int(config.result_cache_max_mb * 1024 * 1024)
+
+    return ResultCache(
+        config.result_cache_path,
+        max_entries=config.result_cache_max_entries,
+        max_bytes=max_bytes,
+    )
+
+
+def simulation_executor(config: SimulationConfig):
+    """
+    ProcessPoolExecutor kun config.workers > 1, muuten None (ajetaan
+    samassa prosessissa).
+    """
+    if config.workers and config.workers > 1:
+        return ProcessPoolExecutor(max_workers=config.workers)
+    return None
+
+
+def resolve_seed(config: SimulationConfig) -> int:
+    if config.random_seed is not None:
+        return config.random_seed
+    return random.SystemRandom().getrandbits(63)
+
+
+def run_simulation_stream(config: SimulationConfig, hero_strategy=None):
+    """
+    Generaattori: tuottaa juoksevan tilanteen (ResultAccumulator.progress) jokaisen
+    chunkin jälkeen kaikille vastustajamäärille. Viimeisessä tilanteessa
+    per vastustajamäärä on done=True. Nested-ajossa jokaisen chunkin jälkeen
+    tulee tilanne jokaiselle vastustajamäärälle.
+    """
+    assert_unique_cards(config.hero_hand, config.board)
+
+    base_seed = resolve_seed(config)
+    max_opps = min(6, len(config.opponent_profiles))
+
+    executor = simulation_executor(config)
+    try:
+        if config.nested_opponents:
+            for _, snapshots in iter_nested_progress(
+                config, max_opps, base_seed, hero_strategy, executor,
+            ):
+                yield from snapshots
+            return
+
+        for opp_count in range(1, max_opps + 1):
+            for _, snapshot in iter_progress(
+                config, opp_count, base_seed, hero_strategy, executor,
+            ):
+                yield snapshot
+    finally:
+        if executor is not None:
+            executor.shutdown(cancel_futures=True)
+
+
+def run_simulation(config: SimulationConfig, progress=None) -> List[SimulationResult]:
+    """
+    progress: valinnainen callback, jota kutsutaan jokaisen chunkin
+    jälkeen ResultAccumulator.progress-sanakirjalla.
+    """
+
+    if config.mode == "EXACT":
+        from engine.exact import run_exact_equity
+        return run_exact_equity(config)
+
+    assert_unique_cards(config.hero_hand, config.board)
+
+    base_seed = resolve_seed(config)
+
+    evaluators_before = evaluator_instances_created()
+    results = []
+    run_tally = ResultAccumulator()
+
+    max_opps = min(6, len(config.opponent_profiles))
+
+    if config.nested_opponents and config.engine != "python":
+        raise ValueError("nested_opponents vaatii python-moottorin")
+
+    # nested-ajon tulokset ovat eri otos kuin erillisten ajojen: ei välimuistia
+    result_cache = None if config.nested_opponents else open_result_cache(config)
+
+    def opp_count_tallies():
+        if config.nested_opponents:
+            yield from run_nested_chunks(
+                config, max_opps, base_seed, executor=executor, progress=progress,
+            )
+            return
+
+        for opp_count in range(1, max_opps + 1):
+            if result_cache is not None:
+                yield cached_run_chunks(
+                    result_cache, config, opp_count, base_seed,
+                    executor=executor, progress=progress,
+                )
+            else:
+                yield run_chunks(
+                    config, opp_count, base_seed, executor=executor, progress=progress,
+                )
+
+    executor = simulation_executor(config)
+    try:
+        for opp_count, tally in enumerate(opp_count_tallies(), start=1):
+            run_tally.merge(tally)
+
+            result = tally.to_result(opp_count)
+            results.append(result)
+
+            if config.verbose:
+                mode = "HU" if opp_count == 1 else "MW"
+                print(
+                    f"[{mode}] Opps={opp_count} | "
+                    f"EV/hand={result.ev_per_hand:.3f} | "
+                    f"bb/100={result.bb_per_100:.2f} | "
+                    f"SD freq={result.sd_freq:.2f}% | "
+                    f"SD EV={tally.showdown_net_bb:.2f} | "
+                    f"NSD EV={tally.non_sd_net_bb:.2f}"
+                )
+                if result.instrumentation is not None:
+                    print(f"[INSTR] Opps={opp_count} | " + format_report(result.instrumentation))
+    finally:
+        if executor is not None:
+            executor.shutdown()
+        if result_cache is not None:
+            cache_stats = result_cache.stats()
+            result_cache.close()
+
+    if not config.verbose:
+        return results
+
+    if result_cache is not None:
         print(
-            f"[{mode}] Opps={opp_count} | "
-            f"EV/hand={ev_per_hand:.3f} | "
-            f"bb/100={bb_per_100:.2f} | "
-            f"SD freq={sd_count / total_hands * 100:.2f}% | "
-            f"SD EV={showdown_net_bb:.2f} | "
-            f"NSD EV={non_sd_net_bb:.2f}"
+            f"[RESULTS] cache hits={cache_stats['hits']} | misses={cache_stats['misses']} | "
+            f"entries={cache_stats['entries']} | {cache_stats['bytes'] / 1024:.1f} KiB"
         )
 
-        results.append(
-            SimulationResult(
-                opponents=opp_count,
-                wins=wins,
-                losses=losses,
-                ties=ties,
-                equity=round(showdown_equity, 2),
-                non_showdown_win_pct=round(non_sd_pct, 2),
-                showdown_win_pct=round(showdown_equity, 2),
+    print(
+        f"[EVAL] Evaluator instances created: "
+        f"{evaluator_instances_created() - evaluators_before}"
+    )
+
+    if config.eval_cache_size and config.engine != "numpy":
+        print(
+            "[CACHE] " + format_cache_stats(
+                run_tally.eval_cache_hits,
+                run_tally.eval_cache_misses,
+                run_tally.eval_cache_evictions,
             )
         )
 
@@ -756,6 +1304,9 @@ def run_simulation(config: SimulationConfig) -> List[SimulationResult]:
 
 
 
+STRATEGY_REFERENCE = "BASELINE"
+
+
 def run_simulation_with_strategies(config: SimulationConfig):
     strategies = {
         "PASSIVE": HeroStrategyProfile(aggression=0.7, bluff_freq=0.6),
@@ -763,87 +1314,200 @@ def run_simulation_with_strategies(config: SimulationConfig):
         "AGGRESSIVE": HeroStrategyProfile(aggression=1.3, bluff_freq=1.4),
     }
 
-    for name, strategy in strategies.items():
-        print("\n" + "=" * 60)
-        print(f" HERO STRATEGY: {name}")
-        print("=" * 60)
+    executor = simulation_executor(config)
+    try:
+        if config.paired_strategies:
+            run_simulation_paired_strategies(config, strategies, executor=executor)
+            return
+
+        for name, strategy in strategies.items():
+            print("\n" + "=" * 60)
+            print(f" HERO STRATEGY: {name}")
+            print("=" * 60)
 
-        run_simulation_single_strategy(config, strategy)
+            run_simulation_single_strategy(config, strategy, executor=executor)
+    finally:
+        if executor is not None:
+            executor.shutdown()
 
 
 def run_simulation_single_strategy(
     config: SimulationConfig,
     hero_strategy: HeroStrategyProfile,
+    executor=None,
 ):
-    evaluator = Evaluator()
-    hero_position = config.position or "BTN"
+    base_seed = resolve_seed(config)
 
     for opp_count in range(1, min(3, len(config.opponent_profiles)) + 1):
 
-        wins = losses = 0
-        showdown_wins = showdown_losses = showdown_hands = 0
-        total_net_bb = 0.0
+        tally = run_chunks(
+            config, opp_count, base_seed,
+            hero_strategy=hero_strategy, executor=executor,
+        )
+        print_strategy_tally(opp_count, tally)
+
+
+def print_strategy_tally(opp_count: int, tally: ResultAccumulator) -> None:
+    # tasapeli lasketaan tässä raportissa sekä voitoksi että häviöksi
+    ties = tally.ties
+    wins = tally.wins + ties
+    losses = tally.losses + ties
+    showdown_wins = tally.showdown_wins + 0.5 * ties
+    showdown_losses = tally.showdown_losses + 0.5 * ties
+    showdown_hands = tally.sd_count
+    total_net_bb = tally.total_net_bb
+
+    total_hands = wins + losses
+    ev_per_hand = total_net_bb / max(1, total_hands)
+    bb_per_100 = ev_per_hand * 100
+
+    showdown_total = showdown_wins + showdown_losses
+    showdown_eq = (
+        showdown_wins / showdown_total * 100
+        if showdown_total else 0.0
+    )
 
-        vpip_tracker = {"total": 0, "played": 0}
+    mode = "HU" if opp_count == 1 else "MW"
 
-        opponents = [
-            (player, hero_position)
-            for player in config.opponent_profiles[:opp_count]
-        ]
+    print(
+        f"[{mode}] Opponents: {opp_count} | "
+        f"EV/hand: {ev_per_hand:.3f} bb | "
+        f"bb/100: {bb_per_100:.1f} | "
+        f"SD EQ: {showdown_eq:.1f}% | "
+        f"SD freq: {showdown_hands / total_hands * 100:.1f}%"
+    )
+
+
+# ======================================================
+# PARITETTU AJO (COMMON RANDOM NUMBERS)
+# ======================================================
+
+def run_paired_chunk(config, opp_count, chunk_index, hands, base_seed, strategies,
+                     reference=STRATEGY_REFERENCE):
+    """
+    Pelaa chunkin jokaisen käden kaikilla strategioilla. Käsikohtainen seed
+    arvotaan chunkin RNG:stä (yksi arvonta per käsi), ja jokainen strategia
+    saa siitä omat DecisionStreamsit, joten jaot, rangearvonnat ja
+    vastustajien päätökset ovat samat.
 
-        for _ in range(config.iterations):
+    Palauttaa (tallies, diffs): diffs[name] = {"hands", "sum", "sum_sq"}
+    käsikohtaisista eroista net_bb(name) - net_bb(reference).
+    """
+    hand_rng = random.Random(derive_seed(base_seed, opp_count, chunk_index, "paired"))
+
+    hero_position = config.position or "BTN"
+    range_cache = shared_range_cache(derive_seed(base_seed, "ranges"))
+    opponents = compile_opponents(
+        [(player, hero_position) for player in config.opponent_profiles[:opp_count]],
+        range_cache,
+    )
+    evaluator = get_evaluator(config.evaluator_backend)
+    eval_cache = get_eval_cache(config.eval_cache_size)
+    board_index = get_board_index() if config.use_board_index else None
+
+    tallies = {name: ResultAccumulator() for name in strategies}
+    trackers = {name: {"total": 0, "played": 0} for name in strategies}
+    diffs = {name: {"hands": 0, "sum": 0.0, "sum_sq": 0.0} for name in strategies}
+    deck = Deck()
+
+    for _ in range(hands):
+        hand_seed = hand_rng.getrandbits(63)
+        nets = {}
+
+        for name, strategy in strategies.items():
             result, street, net_bb = simulate_postflop_once(
                 hero_hand=config.hero_hand,
                 fixed_board=config.board,
                 opponents=opponents,
                 evaluator=evaluator,
-                hero_strategy=hero_strategy,
-                vpip_tracker=vpip_tracker,
+                hero_strategy=strategy,
+                vpip_tracker=trackers[name],
+                eval_cache=eval_cache,
+                board_index=board_index,
+                rng=DecisionStreams(hand_seed),
+                deck=deck,
             )
+            tallies[name].add(result, street, net_bb)
+            nets[name] = net_bb
 
-            total_net_bb += net_bb
-
-            if result in ("win", "loss", "tie"):
-                showdown_hands += 1
-
-            if result == "win":
-                wins += 1
-                showdown_wins += 1
-            elif result == "loss":
-                losses += 1
-                showdown_losses += 1
-            elif result == "tie":
-                showdown_wins += 0.5
-                showdown_losses += 0.5
-                wins += 1
-                losses += 1
-            elif result == "win_noshowdown":
-                wins += 1
-            elif result == "loss_noshowdown":
-                losses += 1
-
-        total_hands = wins + losses
-        ev_per_hand = total_net_bb / max(1, total_hands)
-        bb_per_100 = ev_per_hand * 100
-
-        showdown_total = showdown_wins + showdown_losses
-        showdown_eq = (
-            showdown_wins / showdown_total * 100
-            if showdown_total else 0.0
-        )
+        for name, net_bb in nets.items():
+            d = net_bb - nets[reference]
+            diff = diffs[name]
+            diff["hands"] += 1
+            diff["sum"] += d
+            diff["sum_sq"] += d * d
 
-        mode = "HU" if opp_count == 1 else "MW"
+    for name, tally in tallies.items():
+        tally.vpip_total = trackers[name]["total"]
+        tally.vpip_played = trackers[name]["played"]
 
-        print(
-            f"[{mode}] Opponents: {opp_count} | "
-            f"EV/hand: {ev_per_hand:.3f} bb | "
-            f"bb/100: {bb_per_100:.1f} | "
-            f"SD EQ: {showdown_eq:.1f}% | "
-            f"SD freq: {showdown_hands / total_hands * 100:.1f}%"
-        )
+    return tallies, diffs
 
 
+def _run_paired_chunk_task(args):
+    return run_paired_chunk(*args)
 
 
+def run_simulation_paired_strategies(config: SimulationConfig, strategies: dict,
+                                     executor=None, reference=STRATEGY_REFERENCE) -> dict:
+    """
+    Kaikki strategiat samoilla käsillä. Raportoi jokaiselle strategialle
+    EV-eron referenssiin (BASELINE) ja sen parittaisen keskivirheen sekä
+    vertailuksi keskivirheen, joka vastaisi riippumattomia ajoja.
 
+    Ajetaan aina python-moottorilla (päätöskohtaiset RNG-virrat).
+    Palauttaa {opp_count: {name: {"ev_diff", "se", "unpaired_se"}}}.
+    """
+    base_seed = resolve_seed(config)
+    report = {}
+
+    for opp_count in range(1, min(3, len(config.opponent_profiles)) + 1):
+        tasks = [
+            (config, opp_count, i, hands, base_seed, strategies, reference)
+            for i, hands in enumerate(chunk_sizes(config))
+        ]
+        mapper = executor.map if executor is not None else map
+
+        tallies = {name: ResultAccumulator() for name in strategies}
+        diffs = {name: {"hands": 0, "sum": 0.0, "sum_sq": 0.0} for name in strategies}
+
+        for part_tallies, part_diffs in mapper(_run_paired_chunk_task, tasks):
+            for name in strategies:
+                tallies[name].merge(part_tallies[name])
+                for key, value in part_diffs[name].items():
+                    diffs[name][key] += value
+
+        print("\n" + "=" * 60)
+        print(f" PAIRED STRATEGIES | Opponents: {opp_count}")
+        print("=" * 60)
+
+        _, ref_se = tallies[reference].ev()
+
+        report[opp_count] = {}
+        for name in strategies:
+            print(f" {name}")
+            print_strategy_tally(opp_count, tallies[name])
+
+            if name == reference:
+                continue
+
+            diff = diffs[name]
+            ev_diff, se = mean_and_se(diff["sum"], diff["sum_sq"], diff["hands"])
+
+            _, own_se = tallies[name].ev()
+            unpaired_se = math.sqrt(own_se ** 2 + ref_se ** 2)
+
+            print(
+                f"[PAIRED] {name} - {reference}: "
+                f"ΔEV/hand {ev_diff:+.3f} ± {se:.3f} bb | "
+                f"Δbb/100 {ev_diff * 100:+.1f} ± {se * 100:.1f} | "
+                f"unpaired SE {unpaired_se:.3f} bb"
+            )
+
+            report[opp_count][name] = {
+                "ev_diff": ev_diff,
+                "se": se,
+                "unpaired_se": unpaired_se,
+            }
 
+    return report
@@ -1,4 +1,6 @@
 ﻿import random
+from bisect import bisect_left
+from itertools import accumulate
 
 
 def assert_unique_cards(*card_lists):
@@ -9,11 +11,153 @@ def assert_unique_cards(*card_lists):
     if len(all_cards) != len(set(all_cards)):
         raise ValueError(f"Duplikaattikortti havaittu: {all_cards}")
 
-def weighted_choice(items, weights):
-    total = sum(weights)
-    r = random.uniform(0, total)
-    upto = 0
-    for item, w in zip(items, weights):
-        upto += w
-        if upto >= r:
-            return item
+def weighted_choice(items, weights, rng=random):
+    """
+    Painotettu valinta kumulatiivisilla summilla + bisect.
+    Kertakäyttöön; toistuviin arvontoihin käytä WeightedSampleria.
+    """
+    if not items:
+        return None
+
+    cum_weights = list(accumulate(weights))
+    r = rng.uniform(0, cum_weights[-1])
+    return items[min(bisect_left(cum_weights, r), len(items) - 1)]
+
+
+class WeightedSampler:
+    """
+    Uudelleenkäytettävä painotettu arpoja (kumulatiivinen summa + bisect).
+
+    Rakennetaan kerran per range. Jos itemeillä on korttimaskit, blokatut
+    itemit voidaan sulkea pois arvonnassa ilman uudelleenrakennusta:
+    arvotaan koko jakaumasta ja hylätään blokatut (sama jakauma kuin
+    suodatetulla listalla). Jos hylkäyksiä tulee liikaa, arvotaan suoraan
+    suodatetusta listasta.
+
+    Huom: blokatut rangearvonnat tehtiin aiemmin lineaarisella
+    weighted_choicella suodatetusta listasta globaalia randomia käyttäen.
+    Nyt ne arvotaan annetusta rng:stä hylkäämällä, joten ne kuluttavat
+    satunnaislukuja eri tahtiin. Jakauma on sama, mutta sama seed antaa
+    eri tulokset kuin ennen WeightedSampleria.
+    """
+
+    __slots__ = ("items", "weights", "masks", "cum_weights", "total", "all_mask")
+
+    MAX_REJECTIONS = 32
+
+    def __init__(self, items, weights, masks=None):
+        self.items = tuple(items)
+        self.weights = tuple(weights)
+        self.masks = tuple(masks) if masks is not None else None
+        self.cum_weights = tuple(accumulate(self.weights))
+        self.total = self.cum_weights[-1] if self.cum_weights else 0.0
+
+        all_mask = 0
+        for m in self.masks or ():
+            all_mask |= m
+        self.all_mask = all_mask
+
+    def __len__(self):
+        return len(self.items)
+
+    def _draw(self, rng) -> int:
+        r = rng.uniform(0, self.total)
+        return min(bisect_left(self.cum_weights, r), len(self.items) - 1)
+
+    def sample(self, rng=random, blocked_mask: int = 0):
+        """
+        Palauttaa itemin tai None, jos kaikki on blokattu.
+        """
+        if not self.items:
+            return None
+
+        if not self.all_mask & blocked_mask:
+            return self.items[self._draw(rng)]
+
+        masks = self.masks
+        for _ in range(self.MAX_REJECTIONS):
+            i = self._draw(rng)
+            if not masks[i] & blocked_mask:
+                return self.items[i]
+
+        live = [i for i, m in enumerate(masks) if not m & blocked_mask]
+        if not live:
+            return None
+        i = weighted_choice(live, [self.weights[j] for j in live], rng)
+        return self.items[i]
+
+
+def derive_seed(base_seed, *keys) -> int:
+    """
+    Johtaa deterministisen aliseedin (esim. chunkille) pääseedistä.
+    Sama (base_seed, keys) antaa aina saman seedin prosessista riippumatta.
+    """
+    label = ":".join(str(k) for k in (base_seed,) + keys)
+    return random.Random(label).getrandbits(63)
+
+
+class DecisionStreams:
+    """
+    Erillinen satunnaislähde jokaiselle päätöskohdalle yhdessä kädessä
+    (common random numbers). Kun strategiat pelaavat saman käden samalla
+    seedillä, sama päätöskohta saa samat luvut, vaikka aiemmat päätökset
+    olisivat kuluttaneet eri määrän arvontoja.
+    """
+
+    __slots__ = ("seed", "_streams")
+
+    def __init__(self, seed):
+        self.seed = seed
+        self._streams = {}
+
+    def __call__(self, point: str) -> random.Random:
+        stream = self._streams.get(point)
+        if stream is None:
+            stream = random.Random(f"{self.seed}:{point}")
+            self._streams[point] = stream
+        return stream
+
+
+class ReplayStreams:
+    """
+    Päätöskohtaiset satunnaisluvut, jotka toistetaan samoina saman käden
+    usealle ratkaisulle (nested-moottori: jokainen vastustajamäärä).
+
+    Luvut arvotaan yhteisestä lähteestä vasta, kun jokin ratkaisu tarvitsee
+    niitä ensimmäisen kerran, ja tallennetaan; rewind() palauttaa kaikki
+    päätöskohdat alkuun. Päätöskohdissa tarvitaan vain random().
+    """
+
+    __slots__ = ("source", "_streams")
+
+    def __init__(self, source):
+        self.source = source
+        self._streams = {}
+
+    def __call__(self, point: str) -> "_ReplayStream":
+        stream = self._streams.get(point)
+        if stream is None:
+            stream = _ReplayStream(self.source)
+            self._streams[point] = stream
+        return stream
+
+    def rewind(self) -> None:
+        for stream in self._streams.values():
+            stream.pos = 0
+
+
+class _ReplayStream:
+
+    __slots__ = ("source", "values", "pos")
+
+    def __init__(self, source):
+        self.source = source
+        self.values = []
+        self.pos = 0
+
+    def random(self) -> float:
+        pos = self.pos
+        if pos == len(self.values):
+            self.values.append(self.source.random())
+        self.pos = pos + 1
+        return self.values[pos]
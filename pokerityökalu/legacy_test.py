@@ -1,6 +1,8 @@
 
 
 import random
+from bisect import bisect_left
+from itertools import accumulate
 from treys import Card as TreysCard, Evaluator
 MODE = "PLAY"   # "PLAY" = fold-logiikka päällä
 
@@ -421,13 +423,10 @@ def compute_preflop_equity(hero_hand, opp_count, hero_position, boards_per_match
 # ---------- RANGE-APUFUNKTIOT ----------
 
 def weighted_choice(items, weights):
-    total = sum(weights)
-    r = random.uniform(0, total)
-    upto = 0
-    for item, w in zip(items, weights):
-        upto += w
-        if upto >= r:
-            return item
+    # kumulatiivinen summa + bisect (ei lineaarista skannausta)
+    cum_weights = list(accumulate(weights))
+    r = random.uniform(0, cum_weights[-1])
+    return items[min(bisect_left(cum_weights, r), len(items) - 1)]
 
 
 def normalize_range(range_input):
@@ -0,0 +1,50 @@
+﻿# -*- coding: utf-8 -*-
+
+import random
+
+import pytest
+from treys import Evaluator
+
+from engine.cards import Deck, to_treys
+from engine.evaluator import get_evaluator
+
+
+HANDS = 3000
+SEED = 1
+
+
+def _deals(seed=SEED, hands=HANDS):
+    """Hero + 3/4/5 boardkorttia simulaattorin omalla Deckillä."""
+    rng = random.Random(seed)
+    deck = Deck()
+    for i in range(hands):
+        deck.reset()
+        cards = deck.draw(5 + i % 3, rng)
+        yield cards[:2], cards[2:]
+
+
+def test_lookup_matches_treys():
+    reference = Evaluator()
+    lookup = get_evaluator("lookup")
+
+    mismatches = [
+        (hand, board)
+        for hand, board in _deals()
+        if lookup.evaluate(to_treys(board), to_treys(hand))
+        != reference.evaluate(to_treys(board), to_treys(hand))
+    ]
+    assert not mismatches, f"{len(mismatches)}/{HANDS} eroa, esim. {mismatches[:3]}"
+
+
+def test_batch_evaluator_matches_treys():
+    np = pytest.importorskip("numpy")
+    from engine.batch_simulator import get_batch_evaluator
+
+    reference = Evaluator()
+    batch = get_batch_evaluator()
+
+    for size in (5, 6, 7):
+        deals = [hand + board for hand, board in _deals() if len(hand) + len(board) == size]
+        got = batch.evaluate(np.array(deals, dtype=np.int64))
+        expected = [reference.evaluate(to_treys(cards[2:]), to_treys(cards[:2])) for cards in deals]
+        assert got.tolist() == expected
@@ -0,0 +1,33 @@
+﻿# -*- coding: utf-8 -*-
+
+from engine.config import SimulationConfig
+from engine.player_profile import PlayerProfile
+from engine.positional_player import PositionalPlayer
+from engine.result_cache import scenario_key
+
+
+def _config(hero, board, seed=7):
+    return SimulationConfig(
+        hero_hand=hero,
+        position="BTN",
+        board=board,
+        mode="PLAY",
+        random_seed=seed,
+        opponent_profiles=[PositionalPlayer("V1", {"BTN": PlayerProfile()})],
+        verbose=False,
+    )
+
+
+def test_street_order_changes_key():
+    # samat kortit, eri turn: Qd vs 2c
+    a = _config(["Ah", "Kh"], ["Ks", "7h", "2c", "Qd"])
+    b = _config(["Ah", "Kh"], ["Qd", "Ks", "7h", "2c"])
+    assert scenario_key(a, 1) != scenario_key(b, 1)
+
+
+def test_flop_order_and_suit_permutation_share_key():
+    a = _config(["Ah", "Kh"], ["Ks", "7h", "2c", "Qd"])
+    b = _config(["Ah", "Kh"], ["2c", "Ks", "7h", "Qd"])
+    # h <-> d ja s <-> c vaihdettu
+    c = _config(["Ad", "Kd"], ["Kc", "7d", "2s", "Qh"])
+    assert scenario_key(a, 1) == scenario_key(b, 1) == scenario_key(c, 1)